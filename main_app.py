@@ -4,12 +4,17 @@ import time
 import machine
 from machine import Pin, SPI
 import math
+import micropython
+from micropython import const
 import ntptime
 import gc
 import uio
 import sys
 import uasyncio
-import hashlib
+try:
+    from hashlib import sha256 as _sha256   # port's C sha256 (mbedTLS where built in)
+except ImportError:
+    from uhashlib import sha256 as _sha256
 from phew import access_point, connect_to_wifi, is_connected_to_wifi, dns, server
 from phew.template import render_template
 from phew import logging
@@ -27,6 +32,16 @@ import vga1_8x16 as font_sm
 import vga1_16x16 as font_lg
 import vga1_16x32 as font_huge
 
+# Warm up json/hashing once at boot so the first /settings request and the
+# first OTA checksum pass don't pay the one-time slow path
+try:
+    json.dumps(None)
+    json.loads("{}")
+    _sha256(b"").digest()
+    binascii.hexlify(b"\x00")
+except Exception:
+    pass
+
 # === Software Version ===
 __version__ = "1.0.0"
 # ========================
@@ -37,11 +52,15 @@ AP_DOMAIN = "scforecaster.net"
 AP_TEMPLATE_PATH = "ap_templates"
 APP_TEMPLATE_PATH = "app_templates"
 SETTINGS_FILE = "settings.json"
-WIFI_MAX_ATTEMPTS = 3
+SUN_FILE = "sun.json"   # today's sunrise/sunset, survives a reboot
+_WIFI_MAX_ATTEMPTS = const(3)
+_WIFI_CHECK_MIN = const(60)    # seconds between link checks while connected
+_WIFI_CHECK_MAX = const(600)   # longest gap between reconnect attempts
+_WIFI_BOOT_BACKOFF_MAX = const(60)  # cap on the pause between boot attempts
 
 # === Initialize/define parameters ===
-SYNC_INTERVAL = 3600 # Sync to NTP time server every hour
-WEATH_INTERVAL = 1800 # Update forecast every 30 mins
+_SYNC_INTERVAL = const(3600)  # Sync to NTP time server every hour
+_WEATH_INTERVAL = const(1800)  # Update forecast every 30 mins
 last_sync = 0
 last_weather_update = 0
 press_time = None
@@ -55,7 +74,6 @@ weath_setup_complete = False
 client_connected = False
 sunrise = None
 sunset = None
-last_sun_fetch_day = None
 last_displayed_time = ""
 last_displayed_date = ""
 last_sun_update_date = None  # track date of last sunrise/sunset fetch
@@ -63,13 +81,18 @@ sunrise_sunset_data = None   # to store sunrise/sunset info
 retry_allowed = True  # flag whether to allow lat/lon lookup retry or not
 
 UPLOAD_TEMP_SUFFIX = ".tmp"
+_UPLOAD_CHUNK = const(4096)  # OTA upload read/write size (one flash block)
+_DEBUG = const(0)   # 1 = trace OTA steps and forecast parsing on the console (compiled out when 0)
+_LOG_SIZE = const(2048)   # OTA log ring buffer size
+_GC_FLOOR = const(20000)  # forecast fetch only collects when free heap drops below this
 
 # === Need this for NWS Weather API ====
 USER_AGENT = "PLForecastDisplay (phonorad@gmail.com)"  # replace with your info
 
 # === Define Months ===
-MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
-          "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+# Tuple of literals so the compiler stores it as one constant object
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun",
+          "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
 
 # === Define US Timezones ===
 # Standard U.S. timezones without DST applied yet
@@ -87,8 +110,8 @@ TIMEZONE_OFFSETS = {
 gmt_offset = 0   # Initialze gmt offset
 
 # === SPI and Display Init ===
-WIDTH = 240
-HEIGHT = 240
+_WIDTH = const(240)
+_HEIGHT = const(240)
 spi = SPI(1, baudrate=40000000, polarity=1, phase=1, sck=Pin(10), mosi=Pin(11))
 display = gc9a01.GC9A01(
     spi,
@@ -98,8 +121,29 @@ display = gc9a01.GC9A01(
 )
 
 # === Color helper ===
-def color565(r, g, b):
+# Viper: compiled to native integer ops, no boxing of the arguments
+@micropython.viper
+def color565(r: int, g: int, b: int) -> int:
     return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+
+# Common colors precomputed - inlined by the compiler, no call at each use
+BLACK = const(0x0000)          # color565(0, 0, 0)
+RED565 = const(0xF800)         # color565(255, 0, 0)
+GREEN565 = const(0x07E0)       # color565(0, 255, 0)
+YELLOW565 = const(0xFFE0)      # color565(255, 255, 0)
+WHITE565 = const(0xFFFF)       # color565(255, 255, 255)
+CYAN565 = const(0x07FF)        # color565(0, 255, 255)
+LIGHTBLUE565 = const(0xAEDC)   # color565(173, 216, 230)
+CREAM565 = const(0xFFF1)       # color565(255, 254, 140)
+ORANGE565 = const(0xFD00)      # color565(255, 160, 0)
+LAVENDER565 = const(0xDD5E)    # color565(220, 170, 240)
+PINK565 = const(0xFB2C)        # color565(255, 100, 100)
+ICEBLUE565 = const(0x96BF)     # color565(144, 213, 255)
+MINT565 = const(0x67EC)        # color565(100, 255, 100)
+SKYBLUE565 = const(0x965F)     # color565(150, 200, 255)
+LIMEGREEN565 = const(0x47E8)   # color565(64, 255, 64)
+ROYALBLUE565 = const(0x421F)   # color565(64, 64, 255)
+SOFTRED565 = const(0xFA08)     # color565(255, 64, 64)
     
 # === Other GPIO Setup ===
 onboard_led = machine.Pin("LED", machine.Pin.OUT)
@@ -115,35 +159,136 @@ def print_memory_usage():
     print(f"  Allocated: {allocated} bytes")
     print(f"  Total:     {total} bytes\n")
     
-def test_free_memory(max_size=60000, step=1024):
-    gc.collect()  # force garbage collection
-    print("Testing max allocatable memory in bytes...")
-
-    size = step
-    last_good = 0
+def _port_largest_free_block():
+    # Only ESP32 reports its largest free block directly; rp2 has no such API
+    import esp32
+    return max(h[2] for h in esp32.idf_heap_info(esp32.HEAP_DATA))
+
+def tune_gc_threshold():
+    # Collect after every ~quarter-heap of allocations instead of waiting for an
+    # allocation to fail - keeps a large contiguous block free for OTA buffers.
+    # Called once at startup, after the module's fonts and tables are loaded
+    gc.collect()
+    gc.threshold(gc.mem_free() // 4)
 
-    while size <= max_size:
-        try:
-            _ = bytearray(size)
-            last_good = size
-            size += step
-        except MemoryError:
-            break
+def test_free_memory():
+    gc.collect()  # force garbage collection
+    free = gc.mem_free()
+    try:
+        largest = _port_largest_free_block()
+    except Exception:
+        largest = free
+    print("Free heap:", free, "bytes, largest block:", largest, "bytes")
+    return largest
 
-    print("Max allocatable buffer size:", last_good, "bytes")
-    return last_good
+_mkdir_cache = set()   # Directories already known to exist
 
 def safe_mkdirs(path):
-    parts = path.split("/")
+    if path in _mkdir_cache:
+        return
     current = ""
-    for part in parts:
+    for part in path.split("/"):
         if not part:
             continue
         current = current + "/" + part if current else part
+        if current in _mkdir_cache:
+            continue
         try:
-            os.mkdir(current)
+            os.stat(current)
         except OSError:
-            pass  # Directory exists
+            try:
+                os.mkdir(current)
+            except OSError:
+                # Fine if created by someone else meanwhile; otherwise
+                # (no space, read-only FS) leave it uncached and let the
+                # caller's open() report the failure
+                try:
+                    os.stat(current)
+                except OSError:
+                    return
+        _mkdir_cache.add(current)
+    _mkdir_cache.add(path)
+
+def vet_upload_path(path):
+    # Returns (dir_path, path), or (None, None) if the path is not allowed
+    if not path or path[0] == "/" or ".." in path or "\\" in path:
+        return None, None
+    i = path.rfind("/")
+    return (path[:i] if i > 0 else ""), path
+
+def sha256_file_matches(filename, expected_digest, buf):
+    # Hash file through caller's buffer and compare to raw 32-byte digest
+    mv = memoryview(buf)
+    sha = _sha256()
+    with open(filename, "rb") as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            sha.update(mv[:n])
+    actual = sha.digest()
+    if actual != expected_digest:
+        # Hex only needed for logging a mismatch
+        ota_log(f"  Actual:   {binascii.hexlify(actual).decode()}")
+        ota_log(f"  Expected: {binascii.hexlify(expected_digest).decode()}")
+        return False
+    return True
+
+def backup_existing_file(path):
+    # Move an existing file aside as <path>.bak; returns backup name or None
+    backup = path + ".bak"
+    try:
+        os.stat(path)
+    except OSError:
+        return None  # nothing to replace
+    try:
+        os.remove(backup)  # stale backup from an earlier failed update
+    except OSError:
+        pass
+    os.rename(path, backup)
+    return backup
+
+# === OTA log ===
+# OTA handlers write here instead of print() so a slow serial console
+# doesn't block the event loop mid-upload. _log_drainer() empties it in
+# the background; if it fills up the oldest text is dropped
+_log_buf = bytearray(_LOG_SIZE)
+_log_head = 0   # next write position
+_log_len = 0    # bytes waiting to be drained
+
+def ota_log(msg):
+    global _log_head, _log_len
+    data = msg.encode() + b"\n"
+    n = len(data)
+    if n > _LOG_SIZE:
+        data = data[n - _LOG_SIZE:]
+        n = _LOG_SIZE
+    first = min(n, _LOG_SIZE - _log_head)
+    _log_buf[_log_head:_log_head + first] = data[:first]
+    if first < n:
+        _log_buf[:n - first] = data[first:]
+    _log_head = (_log_head + n) % _LOG_SIZE
+    _log_len = min(_log_len + n, _LOG_SIZE)
+
+def drain_log():
+    global _log_len
+    if not _log_len:
+        return
+    out = sys.stdout.buffer if hasattr(sys.stdout, "buffer") else sys.stdout
+    mv = memoryview(_log_buf)
+    start = (_log_head - _log_len) % _LOG_SIZE
+    end = start + _log_len
+    if end <= _LOG_SIZE:
+        out.write(mv[start:end])
+    else:
+        out.write(mv[start:])
+        out.write(mv[:end - _LOG_SIZE])
+    _log_len = 0
+
+async def _log_drainer():
+    while True:
+        drain_log()
+        await uasyncio.sleep(0.5)
 
 # === AP and Wi-Fi Setup ===
 def load_settings():
@@ -238,85 +383,107 @@ def save_settings(settings):
         print("Failed to save settings:", e)
         return False
 
-def serve_config_page(setup_mode: bool):
-    def response_gen():
-        with open(f"{AP_TEMPLATE_PATH}/config_settings.html", "r") as f:
-            for line in f:
-                yield line.replace(
-                    "window.setupMode = false;",
-                    f"window.setupMode = {str(setup_mode).lower()};"
-                )
-    return Response(response_gen(), status=200, headers={"Content-Type": "text/html"})
+# Settings dict used by the web page handlers. Kept in memory after the
+# first read so each GET/POST doesn't re-read and re-parse settings.json;
+# only reloaded if the file's mtime no longer matches what we last saw
+_settings_cache = None
+_settings_mtime = None
+_DEFAULT_WEB_SETTINGS = {
+    "location_source": "zip",
+    "zip": "",
+    "lat": "",
+    "lon": "",
+    "timezone": "",
+    "use_dst": False,
+    "manual_offset": ""
+}
 
-def machine_reset():
-    time.sleep(2)
-    print("Rebooting...")
-    machine.reset()
+def _settings_file_mtime():
+    try:
+        return os.stat(SETTINGS_FILE)[8]
+    except OSError:
+        return None
 
-def setup_mode():
-    print("Entering setup mode...")
-    display.fill(color565(0, 0, 0))
-    center_lgtext("Setup Mode",40, color565(0, 255, 0))
-    center_smtext("On Phone or Computer", 80)
-    center_smtext("Open WiFi/Network settings", 100)
-    center_smtext("and select network:", 120)
-    center_lgtext("S&C Forecaster", 140, color565(255, 255, 0))
-    
-    def load_settings():
+def load_web_settings():
+    global _settings_cache, _settings_mtime
+    mtime = _settings_file_mtime()
+    if _settings_cache is None or mtime != _settings_mtime:
         try:
             with open(SETTINGS_FILE, "r") as f:
-                return json.load(f)
+                _settings_cache = json.load(f)
         except Exception:
             # Defaults if file missing or corrupt
-            return {
-                "location_source": "zip",
-                "zip": "",
-                "lat": "",
-                "lon": "",
-                "timezone": "",
-                "use_dst": False,
-                "manual_offset": ""
-            }
+            _settings_cache = dict(_DEFAULT_WEB_SETTINGS)
+        _settings_mtime = mtime
+    return _settings_cache
+
+def save_web_settings(settings):
+    # Write the merged dict and keep it as the cache - no re-read afterwards
+    global _settings_cache, _settings_mtime
+    if not save_settings(settings):
+        raise OSError("Could not write " + SETTINGS_FILE)
+    _settings_cache = settings
+    _settings_mtime = _settings_file_mtime()
+
+def invalidate_web_settings():
+    global _settings_cache
+    _settings_cache = None
+
+# The config page is ~30KB, so it is streamed from flash in fixed chunks.
+# The setup flag is patched to a same-length string so the file size is
+# still the Content-Length
+_SETUP_FALSE = b"window.setupMode = false;"
+_SETUP_TRUE = b"window.setupMode = true ;"
+
+def serve_config_page(in_setup: bool):
+    path = f"{AP_TEMPLATE_PATH}/config_settings.html"
 
-    def ap_index(request):
-        global client_connected
-        if not client_connected:
-            print("Client browser contacted /")
-            display.fill(color565(0, 0, 0))
-            center_lgtext("WiFi", 40, color565(0, 255, 0))
-            center_lgtext("Connected!", 60, color565(0, 255, 0))
-            center_smtext("Opening Config Page...", 100)
-            center_smtext(f"If page does not load,", 120)
-            center_smtext(f"open browser to:", 140)
-            center_smtext(f"http://{AP_DOMAIN}", 160, color565(255, 255, 0))
-            client_connected = True
-            
-        # Redirect if host header is not the expected AP domain
-        if request.headers.get("host").lower() != AP_DOMAIN.lower():
-            return render_template(f"{AP_TEMPLATE_PATH}/redirect.html", domain = AP_DOMAIN.lower())
-        
-        # setup_mode=True means show WiFi fields, hide software update
-        return serve_config_page(setup_mode=True)
-    
-    def load_settings():
-        try:
-            with open(SETTINGS_FILE, "r") as f:
-                return json.load(f)
-        except Exception:
-            return {
-                "location_source": "zip",
-                "zip": "",
-                "lat": "",
-                "lon": "",
-                "timezone": "",
-                "use_dst": False,
-                "manual_offset": ""
-            }
+    def response_gen():
+        keep = len(_SETUP_FALSE) - 1
+        tail = b"" if in_setup else None   # carried bytes while the flag is unpatched
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(1024)
+                if not chunk:
+                    break
+                if tail is not None:
+                    chunk = tail + chunk
+                    if _SETUP_FALSE in chunk:
+                        chunk = chunk.replace(_SETUP_FALSE, _SETUP_TRUE)
+                        tail = None
+                    else:
+                        # The flag may straddle this chunk and the next
+                        tail = chunk[-keep:]
+                        chunk = chunk[:-keep]
+                yield chunk
+        if tail:
+            yield tail
+
+    return Response(response_gen(), status=200, headers={
+        "Content-Type": "text/html",
+        "Content-Length": os.stat(path)[6]
+    })
+
+def json_response(data, status=200):
+    # Stream the JSON body from a generator: json.dump writes
+    # straight into a byte stream, so no str copy that then has to be encoded
+    def response_gen():
+        out = uio.BytesIO()
+        json.dump(data, out)
+        yield out.getvalue()
+    return Response(response_gen(), status=status, headers={"Content-Type": "application/json"})
+
+def add_settings_routes(in_setup: bool):
+    # /settings GET+POST and /reboot, shared by setup and update mode.
+    # Wi-Fi credentials are only taken from the form in setup mode
+    load_web_settings()   # read settings.json once on mode entry
 
     def settings_get_handler(request):
-        print("GET /settings received (setup mode)")
-        settings = load_settings()
-        return Response(json.dumps(settings), status=200, headers={"Content-Type": "application/json"})
+        print("GET /settings received" + (" (setup mode)" if in_setup else ""))
+        settings = load_web_settings()
+        if not in_setup:
+            print("Sending settings to browser:", settings)
+        return json_response(settings)
 
     def settings_post_handler(request):
         try:
@@ -327,15 +494,17 @@ def setup_mode():
                 print("[Settings] Discarding changes, rebooting without saving")
 
                 # OLED feedback
-                display.fill(color565(0, 0, 0))
-                center_lgtext("Settings", 60, color565(255, 0, 0))  # red text for discard
-                center_lgtext("Not Updated", 80, color565(255, 0, 0))
+                begin_screen()
+                center_lgtext("Settings", 60, RED565)  # red text for discard
+                center_lgtext("Not Updated", 80, RED565)
                 center_smtext("Restarting...", 120)
+                end_screen()
 
                 # Return page with JS to trigger reboot
                 return render_template(f"{AP_TEMPLATE_PATH}/configured.html")
 
-            current_settings = load_settings()
+            # Load existing settings first, only update the fields from the form
+            current_settings = load_web_settings()
             current_settings.update({
                 "location_source": form.get("location_source", "zip"),
                 "zip": form.get("zip", "").strip(),
@@ -344,35 +513,77 @@ def setup_mode():
                 "timezone": form.get("timezone", ""),
                 "use_dst": form.get("use_dst") in ("true", "on", "1"),
                 "manual_offset": form.get("manual_offset", ""),
-                "ssid": form.get("ssid", "").strip(),
-                "password": form.get("password", "").strip()
             })
+            if in_setup:
+                current_settings["ssid"] = form.get("ssid", "").strip()
+                current_settings["password"] = form.get("password", "").strip()
 
-            with open(SETTINGS_FILE, "w") as f:
-                json.dump(current_settings, f)
+            save_web_settings(current_settings)
 
             # Feedback on OLED
-            display.fill(color565(0, 0, 0))
-            center_lgtext("Settings", 60, color565(0, 255, 0))
-            center_lgtext("Saved!", 80, color565(0, 255, 0))
+            begin_screen()
+            center_lgtext("Settings", 60, GREEN565)
+            center_lgtext("Saved!", 80, GREEN565)
             center_smtext("Restarting...", 120)
+            end_screen()
 
             # Return the configured page, reboot done in html code
             return render_template(f"{AP_TEMPLATE_PATH}/configured.html")
 
         except Exception as e:
+            invalidate_web_settings()  # cached dict may hold unsaved changes
             return Response(f"Failed to save settings: {e}", status=500)
-        
+
     def reboot_handler(request):
         print("[REBOOT] Scheduled...")
-        
+
         async def delayed_reboot():
             await uasyncio.sleep(0.1)  # Allow response to flush
             print("[REBOOT] Executing...")
             machine.reset()
-                
+
         uasyncio.create_task(delayed_reboot())
         return Response("Rebooting...", status=200)
+
+    server.add_route("/settings", handler=settings_get_handler, methods=["GET"])
+    server.add_route("/settings", handler=settings_post_handler, methods=["POST"])
+    server.add_route("/reboot", reboot_handler, methods=["POST"])
+
+def machine_reset():
+    time.sleep(2)
+    print("Rebooting...")
+    machine.reset()
+
+def setup_mode():
+    print("Entering setup mode...")
+    begin_screen()
+    center_lgtext("Setup Mode",40, GREEN565)
+    center_smtext("On Phone or Computer", 80)
+    center_smtext("Open WiFi/Network settings", 100)
+    center_smtext("and select network:", 120)
+    center_lgtext("S&C Forecaster", 140, YELLOW565)
+    end_screen()
+
+    def ap_index(request):
+        global client_connected
+        if not client_connected:
+            print("Client browser contacted /")
+            begin_screen()
+            center_lgtext("WiFi", 40, GREEN565)
+            center_lgtext("Connected!", 60, GREEN565)
+            center_smtext("Opening Config Page...", 100)
+            center_smtext(f"If page does not load,", 120)
+            center_smtext(f"open browser to:", 140)
+            center_smtext(f"http://{AP_DOMAIN}", 160, YELLOW565)
+            end_screen()
+            client_connected = True
+            
+        # Redirect if host header is not the expected AP domain
+        if request.headers.get("host").lower() != AP_DOMAIN.lower():
+            return render_template(f"{AP_TEMPLATE_PATH}/redirect.html", domain = AP_DOMAIN.lower())
+        
+        # in_setup=True means show WiFi fields, hide software update
+        return serve_config_page(in_setup=True)
     
     def ap_catch_all(request):
         if request.headers.get("host") != AP_DOMAIN:
@@ -381,10 +592,8 @@ def setup_mode():
         return "Not found.", 404
 
     server.add_route("/", handler = ap_index, methods = ["GET"])
-    server.add_route("/settings", handler=settings_get_handler, methods=["GET"])
-    server.add_route("/settings", handler=settings_post_handler, methods=["POST"])
+    add_settings_routes(in_setup=True)
 #    server.add_route("/exit_no_save", handler=exit_no_save_handler, methods=["GET", "POST"])
-    server.add_route("/reboot", reboot_handler, methods=["POST"])
     server.set_callback(ap_catch_all)
 
     ap = access_point(AP_NAME)
@@ -395,17 +604,19 @@ def start_update_mode():
     print("starting update mode")
     
     expected_checksums = {}
+    last_upload_dir = None   # Skip safe_mkdirs when consecutive files share a folder
     
     ip = network.WLAN(network.STA_IF).ifconfig()[0]
     print(f"start_update_mode: got IP = {ip}")
     
-    display.fill(color565(0, 0, 0))
-    center_lgtext("Settings &",60,color565(0,255,0))
-    center_lgtext("Software",80,color565(0, 255, 0))
-    center_lgtext("Update Mode",100,color565(0, 255, 0))
+    begin_screen()
+    center_lgtext("Settings &",60,GREEN565)
+    center_lgtext("Software",80,GREEN565)
+    center_lgtext("Update Mode",100,GREEN565)
     center_smtext("Enter", 120)
-    center_smtext(f"http://{ip}", 140,color565(255, 255, 0))
+    center_smtext(f"http://{ip}", 140,YELLOW565)
     center_smtext("into browser", 160)
+    end_screen()
 
     def ap_version(request):
         # Return the version defined in main.py
@@ -413,60 +624,72 @@ def start_update_mode():
 
     def swup_handler(request):
         # Serve your software update HTML page here
-        return serve_config_page(setup_mode=False)
+        return serve_config_page(in_setup=False)
 
     def favicon_handler(request):
         return Response("", status=204)  # No Content
     
     async def checksums_handler(request):
         nonlocal expected_checksums
-        print("[CHECKSUMS] Request headers:", request.headers)
-        print("[CHECKSUMS] request._reader =", getattr(request, "_reader", None))
-        print("[CHECKSUMS] request._streaming =", getattr(request, "_streaming", None))
+        if _DEBUG:
+            ota_log(f"[CHECKSUMS] Request headers: {request.headers}")
+            ota_log(f"[CHECKSUMS] request._reader = {getattr(request, '_reader', None)}")
+            ota_log(f"[CHECKSUMS] request._streaming = {getattr(request, '_streaming', None)}")
         try:
-            expected_checksums = request.data
-            print("[CHECKSUMS] Parsed successfully")
-            print("[CHECKSUMS] expected_checksums keys:", list(expected_checksums.keys()))
-            for path, sha in expected_checksums.items():
-                print(f"  - {path}: {sha[:8]}...")    
+            received = request.data
+            if _DEBUG:
+                ota_log("[CHECKSUMS] Parsed successfully")
+                for path, sha in received.items():
+                    ota_log(f"  - {path}: {sha[:8]}...")
+            # Keep raw 32-byte digests so finalize can compare sha.digest() directly.
+            # Only replace the stored set once every digest has converted
+            expected_checksums = {path: binascii.unhexlify(sha) for path, sha in received.items()}
+            gc.collect()
             return Response("Checksums received", status=200)
         
         except Exception as e:
-            print(f"[CHECKSUMS] Exception: {e}")
+            ota_log(f"[CHECKSUMS] Exception: {e}")
             return Response(f"Error reading checksums: {e}", status=400)
 
     async def finalize_handler(request):
         nonlocal expected_checksums
         
-        # Recursive function to delete all .new files in root and subdirs
-        def remove_new_files_recursive(dir_path="."):
-            try:
-                entries = os.listdir(dir_path)
-            except Exception as e:
-                print(f"[FINALIZE] Failed to list directory {dir_path}: {e}")
-                return
-
-            for entry in entries:
-                path = f"{dir_path}/{entry}" if dir_path != "." else entry
+        # Delete all .new files in root and subdirs. Walks the tree with an
+        # explicit stack (no recursion); ilistdir gives the entry type so no
+        # extra os.stat per entry is needed
+        def remove_new_files_recursive(root="."):
+            stack = [root]
+            while stack:
+                dir_path = stack.pop()
+                prefix = "" if dir_path == "." else dir_path + "/"
                 try:
-                    stat = os.stat(path)
-                    mode = stat[0]
-
-                    # Check if directory (MicroPython uses stat[0] & 0x4000 for dir)
-                    if mode & 0x4000:
-                        # It's a directory, recurse
-                        remove_new_files_recursive(path)
-                    else:
-                        # It's a file - delete if endswith .new
-                        if entry.endswith(".new"):
-                            os.remove(path)
-                            print(f"[FINALIZE] Removed {path}")
+                    entries = os.ilistdir(dir_path)
                 except Exception as e:
-                    print(f"[FINALIZE] Error processing {path}: {e}")
+                    ota_log(f"[FINALIZE] Failed to list directory {dir_path}: {e}")
+                    continue
+
+                # Don't delete while the directory iterator is still open
+                to_remove = []
+                for entry in entries:
+                    name = entry[0]
+                    # Check if directory (MicroPython uses type & 0x4000 for dir)
+                    if entry[1] & 0x4000:
+                        stack.append(prefix + name)
+                    elif name.endswith(".new"):
+                        to_remove.append(prefix + name)
+
+                for path in to_remove:
+                    try:
+                        os.remove(path)
+                        if _DEBUG:
+                            ota_log(f"[FINALIZE] Removed {path}")
+                    except Exception as e:
+                        ota_log(f"[FINALIZE] Error processing {path}: {e}")
 
         try:
             data = request.data
-            print("[FINALIZE] Parsed request.data:", data)
+            if _DEBUG:
+                ota_log(f"[FINALIZE] Parsed request.data: {data}")
             # Validate data is dict and contains expected 'status' field
             if not isinstance(data, dict):
                 return Response("Invalid request format", status=400)
@@ -476,93 +699,114 @@ def start_update_mode():
                 return Response("Invalid or missing status value", status=400)
 
         except Exception as e:
-            print(f"[FINALIZE] Failed to parse JSON body: {e}")
+            ota_log(f"[FINALIZE] Failed to parse JSON body: {e}")
             return Response("Invalid JSON", status=400)
         
-        print(f"[FINALIZE] Received status: {status}")
+        if _DEBUG:
+            ota_log(f"[FINALIZE] Received status: {status}")
 
         if status == "error":
-            print("[FINALIZE] Update aborted by client, cleaning up...")
+            ota_log("[FINALIZE] Update aborted by client, cleaning up...")
             remove_new_files_recursive(".")   # Remove all .new files recursively
             expected_checksums.clear()
             return Response("Update aborted by client, files cleaned up", status=200)
         
         # No error, 'OK' received from Broswer, can proceed with checksum check of files
-        print("[FINALIZE] Proceeding with checksum validation...")
-        print("[FINALIZE] expected_checksums keys:", list(expected_checksums.keys()))
+        ota_log("[FINALIZE] Proceeding with checksum validation...")
     
         if not expected_checksums:
             return Response("No checksums received. Cannot verify update.", status=400)
         
         failed = []
-        # Validate checksums
-        for filename, expected_hash in expected_checksums.items():
-            try:
-                print(f"[FINALIZE] Validating {filename}")
-                with open(filename, "rb") as f:
-                    sha = hashlib.sha256()
-                    while True:
-                        chunk = f.read(1024)
-                        if not chunk:
-                            break
-                        sha.update(chunk)
-                    actual_hash = binascii.hexlify(sha.digest()).decode()
-                    print(f"[FINALIZE] Actual:   {actual_hash}")
-                    print(f"[FINALIZE] Expected: {expected_hash}")
-                    if actual_hash != expected_hash:
-                        print(f"[FINALIZE] MISMATCH for {filename}")
-                        failed.append((filename, "Checksum mismatch"))
-                    else:
-                        print(f"[FINALIZE] Checksum OK for {filename}")
-            except Exception as e:
-                print(f"[FINALIZE] ERROR reading {filename}: {e}")
-                failed.append((filename, str(e)))
-
-        if failed:
-            for filename in expected_checksums:
+        staged = []   # (final_name, new_name, backup_name) for each file moved into place
+        # One read buffer shared by all files - readinto() avoids a new bytes per chunk
+        buf = bytearray(4096)
+        # Collect once up front, then keep the collector out of the verify/rename
+        # pass so it can't stall part way through; only small strings and sha
+        # state are allocated here
+        gc.collect()
+        gc.disable()
+        try:
+            # Single pass: verify each file, then move it into place right away.
+            # Replaced files are kept as .bak until the whole update succeeds, so
+            # a failure part way through can be rolled back
+            for filename, expected_hash in expected_checksums.items():
+                if _DEBUG:
+                    ota_log(f"[FINALIZE] Validating {filename}")
                 try:
-                    os.remove(filename)
-                except:
-                    pass
-            return Response("Update failed:\n" + "\n".join(["{}: {}".format(f, reason) for f, reason in failed]), status=500)
+                    if not sha256_file_matches(filename, expected_hash, buf):
+                        ota_log(f"[FINALIZE] MISMATCH for {filename}")
+                        failed.append((filename, "Checksum mismatch"))
+                        break
+                    if _DEBUG:
+                        ota_log(f"[FINALIZE] Checksum OK for {filename}")
+                except Exception as e:
+                    ota_log(f"[FINALIZE] ERROR reading {filename}: {e}")
+                    failed.append((filename, str(e)))
+                    break
 
-        
-        # Rename all .new files except main_app.py.new
-        for filename in expected_checksums:
-            if filename.endswith(".new") and filename != "main_app.py.new":
+                # Rename all .new files except main_app.py.new
+                if not filename.endswith(".new") or filename == "main_app.py.new":
+                    continue
                 final_name = filename[:-4]
-                print(f"[FINALIZE] Renaming: {filename} -> {final_name}")
-                
+                if _DEBUG:
+                    ota_log(f"[FINALIZE] Renaming: {filename} -> {final_name}")
+                backup_name = None
                 try:
                     # Ensure destination folder exists
                     dir_path = "/".join(final_name.split("/")[:-1])
                     if dir_path:
                         safe_mkdirs(dir_path)
-                        print(f"[FINALIZE] Ensured directory exists: {dir_path}")
-                    try:
-                        os.remove(final_name) # Safe overwrite
-                        print(f"[FINALIZE] Removed existing file: {final_name}")
-                    except Exception as e:
-                        print(f"[FINALIZE] No existing file to remove or error: {e}")
-
+                    backup_name = backup_existing_file(final_name)
                     os.rename(filename, final_name)
-                    print(f"Rename OK: {filename} -> {final_name}")
+                    staged.append((final_name, filename, backup_name))
+                    if _DEBUG:
+                        ota_log(f"Rename OK: {filename} -> {final_name}")
                 except Exception as e:
-                    print(f"[FINALIZE] Error reading {filename}: {repr(e)}")
+                    ota_log(f"[FINALIZE] Error renaming {filename}: {repr(e)}")
                     failed.append((filename, repr(e)))
+                    if backup_name:
+                        # Live file was moved aside but the new one never landed
+                        try:
+                            os.rename(backup_name, final_name)
+                        except Exception as e2:
+                            ota_log(f"[FINALIZE] Could not restore {final_name}: {e2}")
+                    break
+        finally:
+            gc.enable()
+            gc.collect()
+
         if failed:
+            # Put back everything already moved into place, then drop the uploads
+            for final_name, new_name, backup_name in reversed(staged):
+                try:
+                    os.rename(final_name, new_name)
+                    if backup_name:
+                        os.rename(backup_name, final_name)
+                    ota_log(f"[FINALIZE] Rolled back {final_name}")
+                except Exception as e:
+                    ota_log(f"[FINALIZE] Rollback error for {final_name}: {e}")
             for filename in expected_checksums:
                 try:
                     os.remove(filename)
                 except:
                     pass
-            return Response("Update finalize failed:\n" + "\n".join([f"{f}: {reason}" for f, reason in failed]), status=500)
+            return Response("Update failed:\n" + "\n".join(["{}: {}".format(f, reason) for f, reason in failed]), status=500)
+
+        # Update applied - old versions no longer needed
+        for final_name, new_name, backup_name in staged:
+            if backup_name:
+                try:
+                    os.remove(backup_name)
+                except Exception as e:
+                    ota_log(f"[FINALIZE] Could not remove backup {backup_name}: {e}")
 
         # OLED display
-        display.fill(color565(0, 0, 0))
-        center_lgtext("Update", 60, color565(0, 255, 0))
-        center_lgtext("Complete!", 80, color565(0, 255, 0))
+        begin_screen()
+        center_lgtext("Update", 60, GREEN565)
+        center_lgtext("Complete!", 80, GREEN565)
         center_smtext("Rebooting on OK", 100)
+        end_screen()
 
         return Response("Update verified and applied", status=200)
 
@@ -570,10 +814,11 @@ def start_update_mode():
         print("Software updated, OK clicked, restarting device...")
 
         # Display restarting received message    
-        display.fill(color565(0, 0, 0))
-        center_lgtext("New Version", 60, color565(0, 255, 0))
-        center_lgtext("Saved!", 80, color565(0, 255, 0))
+        begin_screen()
+        center_lgtext("New Version", 60, GREEN565)
+        center_lgtext("Saved!", 80, GREEN565)
         center_smtext("Restarting device...", 120)
+        end_screen()
 
         return Response("OK", status=200)
 #        return render_template(f"{AP_TEMPLATE_PATH}/update_complete.html")
@@ -586,167 +831,104 @@ def start_update_mode():
         print("[/exit_no_save] Exit without saving requested - restarting device")
 
         # OLED feedback
-        display.fill(color565(0, 0, 0))
-        center_lgtext("Settings", 60, color565(255, 0, 0))  # red text to indicate discard
-        center_lgtext("Not Updated", 80, color565(255, 0, 0))
+        begin_screen()
+        center_lgtext("Settings", 60, RED565)  # red text to indicate discard
+        center_lgtext("Not Updated", 80, RED565)
         center_smtext("Restarting...", 120)
+        end_screen()
 
         # Return the page immediately — it has the JS to trigger reboot after delay
         return render_template(f"{AP_TEMPLATE_PATH}/configured.html")
     
     async def upload_handler(request):
 #        filename = request.query.get("filename")
-        print("Entered upload_handler()")
-        filepath = request.query.get("path") or request.query.get("filename")
-        if not filepath:
-            print("[UPLOAD] Missing path")
+        nonlocal last_upload_dir
+        raw_path = request.query.get("path") or request.query.get("filename")
+        if not raw_path:
+            ota_log("[UPLOAD] Missing path")
             return Response("Missing path", status=400)
         
-        # Sanitize and normalize
-        if ".." in filepath or filepath.startswith("/") or "\\" in filepath:
-            print(f"[UPLOAD] Invalid path: {filepath}")
+        # Sanitize and split off the parent directory in one pass
+        dir_path, filepath = vet_upload_path(raw_path)
+        if filepath is None:
+            ota_log(f"[UPLOAD] Invalid path: {raw_path}")
             return Response("Invalid path", status=400)
 
         # Ensure parent directory exists
         try:
-            dir_path = "/".join(filepath.split("/")[:-1])
-            if dir_path:
-                print(f"[UPLOAD] Ensuring directory: {dir_path}")
+            if dir_path and dir_path != last_upload_dir:
+                if _DEBUG:
+                    ota_log(f"[UPLOAD] Ensuring directory: {dir_path}")
                 safe_mkdirs(dir_path)
+                last_upload_dir = dir_path
         except Exception as e:
-            print(f"[UPLOAD] Failed to create folders: {e}")
+            ota_log(f"[UPLOAD] Failed to create folders: {e}")
             return Response(f"Failed to create folders for {filepath}: {e}", status=500)
     
         try:
-            print(f"[UPLOAD] Starting write to {filepath}")
+            if _DEBUG:
+                ota_log(f"[UPLOAD] Starting write to {filepath}")
+            gc.collect()
             total_written = 0
-            chunk_size = 1024
+            chunk_size = _UPLOAD_CHUNK
 
             with open(filepath, "wb") as f:
-                while True:
-                    chunk = await request.read_body_chunk(chunk_size)
-                    if chunk is None:
-                        await uasyncio.sleep(0.05)
-                        continue
-                    if chunk == b'':
-                        # EOF: end of upload
-                        print("[UPLOAD] Received EOF")
-                        break
-                    f.write(chunk)
-                    total_written += len(chunk)
-#                     print(f"[UPLOAD] Wrote chunk of {len(chunk)} bytes (total so far: {total_written})")
+                if hasattr(request, "readinto_body"):
+                    # Read into one preallocated buffer - no new bytes object per chunk
+                    buf = bytearray(chunk_size)
+                    mv = memoryview(buf)
+                    while True:
+                        n = await request.readinto_body(buf)
+                        if n < 0:
+                            await uasyncio.sleep(0.05)
+                            continue
+                        if n == 0:
+                            # EOF: end of upload
+                            if _DEBUG:
+                                ota_log("[UPLOAD] Received EOF")
+                            break
+                        f.write(mv[:n])
+                        total_written += n
+                else:
+                    # Older server without readinto_body()
+                    while True:
+                        chunk = await request.read_body_chunk(chunk_size)
+                        if chunk is None:
+                            await uasyncio.sleep(0.05)
+                            continue
+                        if chunk == b'':
+                            # EOF: end of upload
+                            if _DEBUG:
+                                ota_log("[UPLOAD] Received EOF")
+                            break
+                        f.write(chunk)
+                        total_written += len(chunk)
             
-            print(f"[UPLOAD] Finished writing {total_written} bytes to {filepath}")
+            gc.collect()
+            if _DEBUG:
+                ota_log(f"[UPLOAD] Finished writing {total_written} bytes to {filepath}")
             
             # Display file received message    
-            display.fill(color565(0, 0, 0))
-            center_lgtext("New Version", 60, color565(0, 255, 0))
-            center_lgtext("Received!", 80, color565(0, 255, 0))
+            begin_screen()
+            center_lgtext("New Version", 60, GREEN565)
+            center_lgtext("Received!", 80, GREEN565)
             center_smtext(f"{total_written}B to ", 100)
             center_smtext(filepath, 120)
             center_smtext("Click OK in browser", 140)
+            end_screen()
 
             return Response(f"Saved {total_written} bytes to {filepath}", status=200)
 
         except Exception as e:
-            print(f"[UPLOAD] Exception while writing to {filepath}: {e}")
+            ota_log(f"[UPLOAD] Exception while writing to {filepath}: {e}")
             return Response(f"Error writing to {filepath}: {e}", status=500)
         
-    def load_settings():
-        try:
-            with open(SETTINGS_FILE, "r") as f:
-                return json.load(f)
-        except Exception:
-            # Defaults if file missing or corrupt
-            return {
-            "location_source": "zip",
-            "zip": "",
-            "lat": "",
-            "lon": "",
-            "timezone": "",
-            "use_dst": False,
-            "manual_offset": ""
-        }
-
-    def json_response(data, status=200):
-        body = json.dumps(data)
-        return Response(
-            body,
-            status=status,
-            headers={"Content-Type": "application/json"}
-        )
-
-    def settings_get_handler(request):
-        print("GET /settings received")
-        settings = load_settings()
-        print("Sending settings to browser:", settings)
-        return Response(json.dumps(settings), status=200, headers={"Content-Type": "application/json"})
-
-    def settings_post_handler(request):
-        try:
-            form = request.form
-            discard = form.get("discard_changes", "false").lower() == "true"
-
-            if discard:
-                print("[Settings] Discarding changes, rebooting without saving")
-
-                # OLED feedback
-                display.fill(color565(0, 0, 0))
-                center_lgtext("Settings", 60, color565(255, 0, 0))  # red text for discard
-                center_lgtext("Not Updated", 80, color565(255, 0, 0))
-                center_smtext("Restarting...", 120)
-
-                # Return page with JS to trigger reboot
-                return render_template(f"{AP_TEMPLATE_PATH}/configured.html")
-            
-            # Load existing settings first
-            current_settings = load_settings()
-            
-            # Only update the fields from the form
-            current_settings.update({
-                "location_source": form.get("location_source", "zip"),
-                "zip": form.get("zip", "").strip(),
-                "lat": form.get("lat", "").strip(),
-                "lon": form.get("lon", "").strip(),
-                "timezone": form.get("timezone", ""),
-                "use_dst": form.get("use_dst") in ("true", "on", "1"),
-                "manual_offset": form.get("manual_offset", ""),
-            })
-            
-            # Save merged settings
-            with open(SETTINGS_FILE, "w") as f:
-                json.dump(current_settings, f)
-                
-            # Show success and reboot
-            display.fill(color565(0, 0, 0))
-            center_lgtext("Settings", 60, color565(0, 255, 0))
-            center_lgtext("Saved!", 80, color565(0, 255, 0))
-            center_smtext("Restarting...", 120)
-            
-            # Return the page; the JS inside configured.html triggers reboot
-            return render_template(f"{AP_TEMPLATE_PATH}/configured.html")
-            
-        except Exception as e:
-            return Response(f"Failed to save settings: {e}", status=500)
-        
-    def reboot_handler(request):
-        print("[REBOOT] Scheduled...")
-        
-        async def delayed_reboot():
-            await uasyncio.sleep(0.1)  # Allow response to flush
-            print("[REBOOT] Executing...")
-            machine.reset()
-                
-        uasyncio.create_task(delayed_reboot())
-        return Response("Rebooting...", status=200)
-        
     def catch_all_handler(request):
         print(f"Fallback route hit: {request.method} {request.path}")
         return Response("Route not found", status=404)
         
     server.add_route("/", handler=swup_handler, methods=["GET"])
-    server.add_route("/settings", handler=settings_get_handler, methods=["GET"])
-    server.add_route("/settings", handler=settings_post_handler, methods=["POST"])
+    add_settings_routes(in_setup=False)
 #    server.add_route("/exit_no_save", handler=exit_no_save_handler, methods=["GET","POST"])
     server.add_route("/version", handler=ap_version, methods=["GET"])
     server.add_route("/favicon.ico", handler=favicon_handler, methods=["GET"])
@@ -755,10 +937,10 @@ def start_update_mode():
     server.add_route("/checksums", handler=checksums_handler, methods=["POST"])
     server.add_route("/finalize", handler=finalize_handler, methods=["POST"])
     server.add_route("/update_complete.html", handler=update_complete_handler, methods=["GET"])
-    server.add_route("/reboot", reboot_handler, methods=["POST"])
         
     # Start the server (if not already running)
     print(f"Waiting for user at http://{ip} ...")
+    uasyncio.create_task(_log_drainer())
     server.run()
 
     # Wait until user clicks OK
@@ -803,21 +985,32 @@ def is_daytime_now():
     hour = t[3]  # Hour is the 4th element in the tuple
     return 7 <= hour < 19  # Define day as between 7am and 7pm (0700 to 1900)
 
+# DST start/end epochs per year, so the Sunday search runs once a year
+_DST_CACHE = {}
+_DOW_T = (0, 3, 2, 5, 0, 3, 5, 1, 4, 6, 2, 4)
+
+def _day_of_week(year, month, day):
+    # Sakamoto's method, 0 = Sunday
+    if month < 3:
+        year -= 1
+    return (year + year // 4 - year // 100 + year // 400 + _DOW_T[month - 1] + day) % 7
+
 def is_us_dst_now():
     """Return True if the current UTC time is in US DST period (2nd Sunday in March to 1st Sunday in November)."""
     t = time.gmtime()
     year = t[0]
 
-    # Find second Sunday in March
-    march = [time.mktime((year, 3, day, 2, 0, 0, 0, 0)) for day in range(8, 15)]
-    dst_start = next(ts for ts in march if time.localtime(ts)[6] == 6)
-
-    # Find first Sunday in November
-    november = [time.mktime((year, 11, day, 2, 0, 0, 0, 0)) for day in range(1, 8)]
-    dst_end = next(ts for ts in november if time.localtime(ts)[6] == 6)
+    bounds = _DST_CACHE.get(year)
+    if bounds is None:
+        # Second Sunday in March, first Sunday in November
+        march_day = 8 + (7 - _day_of_week(year, 3, 1)) % 7
+        nov_day = 1 + (7 - _day_of_week(year, 11, 1)) % 7
+        bounds = (time.mktime((year, 3, march_day, 2, 0, 0, 0, 0)),
+                  time.mktime((year, 11, nov_day, 2, 0, 0, 0, 0)))
+        _DST_CACHE[year] = bounds
 
     now = time.mktime(t)
-    return dst_start <= now < dst_end
+    return bounds[0] <= now < bounds[1]
 
 def apply_gmt_offset_from_settings(settings):
     global gmt_offset, gmt_offset_complete
@@ -848,17 +1041,20 @@ def apply_gmt_offset_from_settings(settings):
 
     gmt_offset_complete = True
 
+# (utc_epoch, offset, local tuple) from the last call - callers within the
+# same second (clock, date, day/night check) share one conversion
+_lt_cache = (None, None, None)
+
 def localtime_with_offset():
 #    Return local time.struct_time adjusted from UTC using timezone offset and DST.
-    
-#    now = time.gmtime()
-#    month = now[1]
-#    mday = now[2]
-#    weekday = now[6]  # 0 = Monday, 6 = Sunday
-    now = time.mktime(time.gmtime())
+    global _lt_cache
+    now = time.time()
     offset = gmt_offset or 0
-    local_timestamp = now + int(offset * 3600)
-    return time.localtime(local_timestamp)
+    if now == _lt_cache[0] and offset == _lt_cache[1]:
+        return _lt_cache[2]
+    t = time.localtime(now + int(offset * 3600))
+    _lt_cache = (now, offset, t)
+    return t
 
 def format_12h_time(t):
     hour = t[3]
@@ -876,13 +1072,32 @@ def format_12h_time(t):
 
     return "{:2d}:{:02d} {}".format(hour_12, t[4], am_pm)
 
+# y -> (x, width) of the last centred text drawn by update_*_only
+_text_spans = {}
+
+def _clear_for_text(y, h, width):
+    # Text is drawn on black, so only the part of the previous string the
+    # new one won't cover needs clearing; the first draw clears the row
+    vw = _ROW_W[y]
+    x = (240 - vw) // 2 + (vw - width) // 2
+    prev = _text_spans.get(y)
+    if prev is None:
+        display.fill_rect(0, y, 240, h, BLACK)
+    else:
+        px, pw = prev
+        if px < x:
+            display.fill_rect(px, y, x - px, h, BLACK)
+        if px + pw > x + width:
+            display.fill_rect(x + width, y, px + pw - x - width, h, BLACK)
+    _text_spans[y] = (x, width)
+
 def update_time_only(time_str):
-    display.fill_rect(0, 40, 240, 20, color565(0, 0, 0))  # Clear just time area
-    center_lgtext(time_str, 40, color565(0, 255, 255))
+    _clear_for_text(40, 20, len(time_str) * 16)  # Clear just time area
+    center_lgtext(time_str, 40, CYAN565)
     
 def update_date_only(date_str):
-    display.fill_rect(0, 20, 240, 20, color565(0, 0, 0))  # Clear just date area
-    center_lgtext(date_str, 20, color565(255, 255, 255))
+    _clear_for_text(20, 20, len(date_str) * 16)  # Clear just date area
+    center_lgtext(date_str, 20, WHITE565)
     
 def fetch_sunrise_sunset(lat, lon, gmt_offset_hours):
     url = f"https://api.sunrise-sunset.org/json?lat={lat}&lng={lon}&formatted=0"
@@ -911,17 +1126,46 @@ def fetch_sunrise_sunset(lat, lon, gmt_offset_hours):
         print("Error fetching sunrise/sunset:", e)
         return None, None
 
+def get_sun_times(lat, lon, gmt_offset_hours):
+    # Sunrise/sunset for today's local date. Reuses sun.json when it was
+    # written today for the same place and offset, so a reboot doesn't
+    # need another HTTPS round-trip. Place and offset are keyed as fixed
+    # strings - floats reloaded from JSON needn't compare equal
+    t = localtime_with_offset()
+    key = [t[0], t[1], t[2], "%.4f" % lat, "%.4f" % lon, "%.2f" % gmt_offset_hours]
+    try:
+        with open(SUN_FILE, "r") as f:
+            saved = json.load(f)
+        if saved["key"] == key:
+            print("Using saved sunrise/sunset from", SUN_FILE)
+            return tuple(saved["sr"]), tuple(saved["ss"])
+    except OSError:
+        pass  # No saved times yet
+    except Exception as e:
+        print(f"Discarding bad {SUN_FILE}: {e}")
+        try:
+            os.remove(SUN_FILE)
+        except OSError:
+            pass
+
+    sr, ss = fetch_sunrise_sunset(lat, lon, gmt_offset_hours)
+    if sr and ss:
+        try:
+            with open(SUN_FILE, "w") as f:
+                json.dump({"key": key, "sr": sr, "ss": ss}, f)
+        except Exception as e:
+            print(f"Could not save {SUN_FILE}: {e}")
+    return sr, ss
+
 def iso8601_to_epoch(iso_str):
     # Example iso_str: "2025-06-21T09:32:00+00:00"
     # Parse manually (MicroPython usually lacks full datetime parsing)
-    # This is a minimal parser:
+    # Fixed-format string, so fields are read at known offsets; the
+    # timezone suffix is ignored
     try:
-        date_part, time_part = iso_str.split("T")
-        year, month, day = map(int, date_part.split("-"))
-        time_str = time_part.split("+")[0].split("Z")[0]
-        hour, minute, second = map(int, time_str.split(":"))
+        t = parse_iso8601(iso_str)
         # Convert to epoch seconds (approximate using time.mktime and assuming no timezone)
-        return time.mktime((year, month, day, hour, minute, second, 0, 0))
+        return time.mktime(t + (0, 0))
     except:
         return 0
     
@@ -937,261 +1181,90 @@ def format_sun_time(t):
 
 # === Forecast Icon selection ====
 
-def get_icon_filename(simplified_now, day):
-    if not simplified_now:
-        simplified_now = "No Forecast"
-    f = simplified_now.lower()
-    print(f"simplified forecast: {f}")
-
-    def match_any(terms):
-        return any(term in f for term in terms)
-
+# Checked in order, first rule with a matching term wins. The icon is a
+# (day, night) pair where it depends on time of day. Terms that contain an
+# earlier term (e.g. "thunderstorm" vs "storm") are left out - they could
+# never be the first match
+_ICON_RULES = (
     # === Severe Weather ===
-    if match_any(["tornado", "funnel cloud"]):
-        icon_filename = "icons/tornado_rgb565.raw"
-    elif match_any(["hurricane"]):
-        icon_filename = "icons/hurricane_rgb565.raw"
-    elif match_any(["tropical storm"]):
-        icon_filename = "icons/trop_storm_rgb565.raw"
-    elif match_any(["winter storm", "blizzard"]):
-        icon_filename = "icons/winter_storm_rgb565.raw"
-    elif match_any(["thunderstorm", "t-storm", "tstorms", "thunderstorms", "storm", "squall", "lightning"]):
-        icon_filename = "icons/tstorm_rgb565.raw"
-
+    (("tornado", "funnel cloud"), "icons/tornado_rgb565.raw"),
+    (("hurricane",), "icons/hurricane_rgb565.raw"),
+    (("tropical storm",), "icons/trop_storm_rgb565.raw"),
+    (("winter storm", "blizzard"), "icons/winter_storm_rgb565.raw"),
+    (("storm", "squall", "lightning"), "icons/tstorm_rgb565.raw"),
     # === Winter Weather / Ice / Hail / Frozen Mix ===
-    elif match_any([
-        "snow", "winter weather", "frost"
-    ]):
-        icon_filename = "icons/snow_rgb565.raw"
-    elif match_any([
-        "sleet", "hail", "ice", "snow grains", "ice pellets", "ice crystals",
-        "snow pellets", "freezing rain", "freezing drizzle"
-    ]):
-        icon_filename = "icons/hail_rgb565.raw"
-
+    (("snow", "winter weather", "frost"), "icons/snow_rgb565.raw"),
+    (("sleet", "hail", "ice", "freezing rain", "freezing drizzle"), "icons/hail_rgb565.raw"),
     # === Rain and Flooding ===
-    elif match_any(["rain", "showers", "drizzle", "precipitation", "mist", "spray"]):
-        icon_filename = "icons/rain_rgb565.raw"
-    elif match_any(["flash flood", "flood"]):
-        icon_filename = "icons/flood_rgb565.raw"
-
+    (("rain", "showers", "drizzle", "precipitation", "mist", "spray"), "icons/rain_rgb565.raw"),
+    (("flood",), "icons/flood_rgb565.raw"),
     # === Obscurants ===
-    elif match_any(["fog"]):
-        icon_filename = "icons/fog_rgb565.raw"
-    elif match_any(["haze", "smoke"]):
-        icon_filename = "icons/smoke_rgb565.raw"
-    elif match_any([
-        "dust", "sand", "volcanic ash", "ash", "dust storm", "sandstorm"
-    ]):
-        icon_filename = "icons/sand_rgb565.raw"
-
+    (("fog",), "icons/fog_rgb565.raw"),
+    (("haze", "smoke"), "icons/smoke_rgb565.raw"),
+    (("dust", "sand", "ash"), "icons/sand_rgb565.raw"),
     # === Wind Conditions ===
-    elif match_any(["wind", "windy", "gust", "gusty", "blowing", "drifting"]):
-        icon_filename = "icons/windy_rgb565.raw"
-
+    (("wind", "gust", "blowing", "drifting"), "icons/windy_rgb565.raw"),
     # === Sky Conditions ===
-    elif match_any(["partly sunny", "partly clear", "p sunny", "p clear"]):
-        icon_filename = "icons/part_cloudy_day_rgb565.raw" if day else "icons/part_cloudy_night_rgb565.raw"
-    elif match_any(["mostly sunny", "m sunny", "mostly clear", "m clear"]):
-        icon_filename = "icons/clear_day_rgb565.raw" if day else "icons/clear_night_rgb565.raw"
-    elif match_any(["partly cloudy", "p cloudy"]):
-        icon_filename = "icons/part_cloudy_day_rgb565.raw" if day else "icons/part_cloudy_night_rgb565.raw"
-    elif match_any(["mostly cloudy", "m cloudy"]):
-        icon_filename = "icons/most_cloudy_day_rgb565.raw" if day else "icons/most_cloudy_night_rgb565.raw"
-    elif match_any(["cloudy", "overcast"]):
-        icon_filename = "icons/cloudy_rgb565.raw"
-    elif match_any(["sun", "clear"]):
-        icon_filename = "icons/clear_day_rgb565.raw" if day else "icons/clear_night_rgb565.raw"
+    (("partly sunny", "partly clear", "p sunny", "p clear"),
+     ("icons/part_cloudy_day_rgb565.raw", "icons/part_cloudy_night_rgb565.raw")),
+    (("mostly sunny", "m sunny", "mostly clear", "m clear"),
+     ("icons/clear_day_rgb565.raw", "icons/clear_night_rgb565.raw")),
+    (("partly cloudy", "p cloudy"),
+     ("icons/part_cloudy_day_rgb565.raw", "icons/part_cloudy_night_rgb565.raw")),
+    (("mostly cloudy", "m cloudy"),
+     ("icons/most_cloudy_day_rgb565.raw", "icons/most_cloudy_night_rgb565.raw")),
+    (("cloudy", "overcast"), "icons/cloudy_rgb565.raw"),
+    (("sun", "clear"), ("icons/clear_day_rgb565.raw", "icons/clear_night_rgb565.raw")),
+)
+
+# _ICON_RULES flattened to (term, icon) pairs with the day/night choice
+# already made: index 0 = day, 1 = night. Terms keep rule order, so the
+# first matching term still picks the same icon as the first matching rule
+_ICON_TERMS = tuple(
+    tuple((term, icon if isinstance(icon, str) else icon[k])
+          for terms, icon in _ICON_RULES for term in terms)
+    for k in (0, 1))
+
+def get_icon_filename(simplified_now, day):
+    if not simplified_now:
+        simplified_now = "No Forecast"
+    f = simplified_now.lower()
+    print(f"simplified forecast: {f}")
 
     # === Fallback ===
-    else:
-        icon_filename = "icons/no_icon_match_rgb565.raw"
+    icon_filename = "icons/no_icon_match_rgb565.raw"
+    for term, icon in _ICON_TERMS[0 if day else 1]:
+        if term in f:
+            icon_filename = icon
+            break
 
     print(f"Icon filename selected: {icon_filename}")
     return icon_filename
 
 # ==== display/drawing functions ====
 
-def replace_color_rgb565(data, from_color, to_color):
-    out = bytearray(len(data))
-    for i in range(0, len(data), 2):
-        color = (data[i] << 8) | data[i+1]
-        if color == from_color:
-            color = to_color
-        out[i] = color >> 8
-        out[i+1] = color & 0xFF
-    return out
-
-def rgb565_to_rgb888(color):
-    r = ((color >> 11) & 0x1F) << 3
-    g = ((color >> 5) & 0x3F) << 2
-    b = (color & 0x1F) << 3
-    return r, g, b
-
-def rgb888_to_rgb565(r, g, b):
-    return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
-
-def display_raw_image_in_chunks(display, filepath, x, y, width, height, scale=1, smooth=False, chunk_rows=8, clear_color=0x0000, clear=True):
-    """
-    Streams a raw RGB565 image to the GC9A01 display in chunks using blit_buffer(),
-    with optional integer scaling and sharpening (sharpening applied after scaling).
-
-    Args:
-        display:     Initialized GC9A01 display object.
-        filepath:    Path to the .raw RGB565 image file.
-        x, y:        Top-left position on the screen to draw the image.
-        width:       Width of the image in pixels.
-        height:      Height of the image in pixels.
-        scale:       Integer scaling factor (default: 1 = no scale).
-        smooth:      Add optional smoothing after scaling
-        chunk_rows:  Number of source image rows per chunk (default: 8).
-        clear_color: Optional background color (default: black).
-        clear:       If True, clear the screen before drawing.
-    """
-    import gc
-
-    def smooth_chunk(data, width, height, threshold=10):
-        out = bytearray(len(data))
-
-        for row in range(height):
-            for col in range(width):
-                center_idx = (row * width + col) * 2
-                center = (data[center_idx] << 8) | data[center_idx + 1]
-                r_sum, g_sum, b_sum, count = 0, 0, 0, 0
-
-                for dy in (-1, 0, 1):
-                    ny = row + dy
-                    if ny < 0 or ny >= height:
-                        continue
-                    for dx in (-1, 0, 1):
-                        nx = col + dx
-                        if nx < 0 or nx >= width:
-                            continue
-                        neighbor_idx = (ny * width + nx) * 2
-                        neighbor = (data[neighbor_idx] << 8) | data[neighbor_idx + 1]
-
-                        # Use your existing helper for RGB conversion
-                        r1, g1, b1 = rgb565_to_rgb888(center)
-                        r2, g2, b2 = rgb565_to_rgb888(neighbor)
-                        dist = abs(r1 - r2) + abs(g1 - g2) + abs(b1 - b2)
-
-                        if dist <= threshold:
-                            r_sum += r2
-                            g_sum += g2
-                            b_sum += b2
-                            count += 1
-
-                if count > 0:
-                    avg_r = r_sum // count
-                    avg_g = g_sum // count
-                    avg_b = b_sum // count
-                    smoothed = rgb888_to_rgb565(avg_r, avg_g, avg_b)
-                else:
-                    smoothed = center
-
-                out[center_idx] = smoothed >> 8
-                out[center_idx + 1] = smoothed & 0xFF
-
-        return out
-
-    bytes_per_pixel = 2
-    row_bytes = width * bytes_per_pixel
-
-    if clear:
-        display.fill(clear_color)
-
-
-    try:
-        with open(filepath, "rb") as f:
-            for row_start in range(0, height, chunk_rows):
-                actual_rows = min(chunk_rows, height - row_start)
-                chunk_size = actual_rows * row_bytes
-                chunk_data = f.read(chunk_size)
-
-                if scale == 1:
-                    display.blit_buffer(chunk_data, x, y + row_start, width, actual_rows)
-                else:
-                    scaled_width = width * scale
-                    scaled_height = actual_rows * scale
-                    scaled_chunk = bytearray(scaled_width * scaled_height * 2)
-
-                    for row in range(actual_rows):
-                        for col in range(width):
-                            src_idx = (row * width + col) * 2
-                            pixel_hi = chunk_data[src_idx]
-                            pixel_lo = chunk_data[src_idx + 1]
+# Same conversion as the viper color565() - one compiled copy for both names
+rgb888_to_rgb565 = color565
 
-                            for dy in range(scale):
-                                dest_row = row * scale + dy
-                                for dx in range(scale):
-                                    dest_col = col * scale + dx
-                                    dest_idx = (dest_row * scaled_width + dest_col) * 2
-                                    scaled_chunk[dest_idx] = pixel_hi
-                                    scaled_chunk[dest_idx + 1] = pixel_lo
-
-                    if smooth:
-                        scaled_chunk = smooth_chunk(scaled_chunk, scaled_width, scaled_height)
-
-                    display.blit_buffer(scaled_chunk, x, y + row_start * scale, scaled_width, scaled_height)
-
-                gc.collect()
-                
-    except Exception as e:
-        print("Error displaying image:", e)
-
-def display_1bit_image_in_chunks(display, path, x0, y0, width, height, fg_color, bg_color):
-    row_bytes = width // 8  # bytes per row in 1-bit format
-    with open(path, "rb") as f:
-        for y in range(height):
-            row = f.read(row_bytes)
-            buf = bytearray(width * 2)  # one line of RGB565
-            for x in range(width):
-                byte_index = x // 8
-                bit_index = 7 - (x % 8)
-                bit = (row[byte_index] >> bit_index) & 1
-                color = fg_color if bit else bg_color
-                i = x * 2
-                buf[i] = color >> 8
-                buf[i + 1] = color & 0xFF
-            display.blit_buffer(buf, x0, y0 + y, width, 1)
-            
-def draw_sparse_1color_grayscale(display, filepath):   # This function used for 2 color (yel/blk) P&L logo, or similar grayscale images
-    with open(filepath, "rb") as f:
-        while True:
-            bytes_read = f.read(3)
-            if not bytes_read or len(bytes_read) < 3:
-                break
-            x, y, gray = bytes_read
-            # Convert grayscale to RGB565 (approximate)
-            rgb565 = ((gray & 0xF8) << 8) | ((gray & 0xFC) << 3) | (gray >> 3)
-            display.pixel(x, y, rgb565)
-            
 def draw_sparse_multicolor_grayscale(display, filepath):
-    WIDTH, HEIGHT = 240, 240
-
-    def rgb_to_rgb565(r, g, b):
-        return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
-
     def map_gray_to_rgb565(gray):
         if gray < 60:
-            return rgb_to_rgb565(0, 0, 0)                  # black
+            return rgb888_to_rgb565(0, 0, 0)                  # black
         elif gray < 121:
-            return rgb_to_rgb565(123, 98, 174)            # lavender
+            return rgb888_to_rgb565(123, 98, 174)            # lavender
         elif gray < 191:
-            return rgb_to_rgb565(131, 160, 127)           # sage
+            return rgb888_to_rgb565(131, 160, 127)           # sage
         else:
-            return rgb_to_rgb565(255, 255, 255)           # white (shouldn't happen in sparse)
+            return rgb888_to_rgb565(255, 255, 255)           # white (shouldn't happen in sparse)
 
     # Allocate full 240x240 RGB565 buffer (2 bytes per pixel)
-    buf = bytearray(WIDTH * HEIGHT * 2)
-    fb = framebuf.FrameBuffer(buf, WIDTH, HEIGHT, framebuf.RGB565)
+    buf = bytearray(_WIDTH * _HEIGHT * 2)
+    fb = framebuf.FrameBuffer(buf, _WIDTH, _HEIGHT, framebuf.RGB565)
 
     # Initialize to white (or whatever your background is)
-#    white = rgb_to_rgb565(255, 255, 255)
-    white = rgb_to_rgb565(233, 245, 208)
-    for i in range(0, len(buf), 2):
-        buf[i] = white >> 8
-        buf[i+1] = white & 0xFF
+#    white = rgb888_to_rgb565(255, 255, 255)
+    white = rgb888_to_rgb565(233, 245, 208)
+    fb.fill(_fb_color(white))   # native fill; byte-swapped for the display
 
     # Load sparse data and draw into buffer
     with open(filepath, "rb") as f:
@@ -1201,12 +1274,12 @@ def draw_sparse_multicolor_grayscale(display, filepath):
                 break
             x, y, gray = triplet
             color = map_gray_to_rgb565(gray)
-            offset = (y * WIDTH + x) * 2
+            offset = (y * _WIDTH + x) * 2
             buf[offset] = color >> 8
             buf[offset + 1] = color & 0xFF
 
     # Push to display in one fast call
-    display.blit_buffer(buf, 0, 0, WIDTH, HEIGHT)
+    display.blit_buffer(buf, 0, 0, _WIDTH, _HEIGHT)
 
 def draw_sparse_1bit(display, filepath, color=0x0000):
     with open(filepath, "rb") as f:
@@ -1231,41 +1304,128 @@ def draw_weather_icon(gc9a01, simplified_now, x, y, is_daytime=None):
             gc9a01.blit_buffer(icon_data, x, y, 64, 64)
 
         except OSError:
-            gc9a01.text(font_lg, "Err", x, y, color565(255, 0, 0))
+            gc9a01.text(font_lg, "Err", x, y, RED565)
     else:
-        gc9a01.text(font_lg, "N/A", x, y, color565(255, 0, 0))
+        gc9a01.text(font_lg, "N/A", x, y, RED565)
 
 # Determine how many pixels acress at a given row for the round display
 def row_visible_width(y, diameter=240):
+    if diameter == 240:
+        return _ROW_W[y] if 0 <= y <= 240 else 0
     r = diameter // 2
     dy = abs(y - r)
     if dy > r:
         return 0  # outside the circle
     return int(2 * math.sqrt(r**2 - dy**2))
 
-def center_smtext(text, y, fg=color565(255,255,255), bg=color565(0,0,0)):
-    visible_width = row_visible_width(y)
+# Visible width of every row of the 240px round display, built once at import
+_ROW_W = bytes(int(2 * math.sqrt(120 * 120 - (y - 120) * (y - 120))) for y in range(241))
+
+def center_smtext(text, y, fg=WHITE565, bg=BLACK):
+    visible_width = _ROW_W[y] if 0 <= y <= 240 else 0
     text_width = len(text) * 8   # 8 pixel wide text
     if visible_width == 0:
         return
     x = (240 - visible_width) // 2 + (visible_width - text_width) // 2
-    display.text(font_sm, text, x, y, fg, bg)
+    draw_text(font_sm, text, x, y, fg, bg)
     
-def center_lgtext(text, y, fg=color565(255,255,255), bg=color565(0,0,0)):
-    visible_width = row_visible_width(y)
+# "in N seconds" lines for the 5 s countdown before a mode switch. All the
+# same length and drawn on black, so each one fully covers the last
+_COUNTDOWN = ("in 5 seconds", "in 4 seconds", "in 3 seconds", "in 2 seconds", "in 1 seconds")
+
+def countdown(y=160):
+    for line in _COUNTDOWN:
+        center_smtext(line, y)
+        time.sleep(1)
+
+def center_lgtext(text, y, fg=WHITE565, bg=BLACK):
+    visible_width = _ROW_W[y] if 0 <= y <= 240 else 0
     text_width = len(text) * 16   # 16 pixel wide text
     if visible_width == 0:
         return
     x = (240 - visible_width) // 2 + (visible_width - text_width) // 2
-    display.text(font_lg, text, x, y, fg, bg)
+    draw_text(font_lg, text, x, y, fg, bg)
     
-def center_hugetext(text, y, fg=color565(255,255,255), bg=color565(0,0,0)):
-    visible_width = row_visible_width(y)
+def center_hugetext(text, y, fg=WHITE565, bg=BLACK):
+    visible_width = _ROW_W[y] if 0 <= y <= 240 else 0
     text_width = len(text) * 16   # 16 pixel wide text
     if visible_width == 0:
         return
     x = (240 - visible_width) // 2 + (visible_width - text_width) // 2
-    display.text(font_huge, text, x, y, fg, bg)
+    draw_text(font_huge, text, x, y, fg, bg)
+
+# === Batched screen drawing ===
+# Full screens (setup/update mode pages) are collected between begin_screen()
+# and end_screen(), then rendered into one RGB565 tile at a time and pushed
+# with a single blit per tile - instead of a fill plus one SPI window per
+# glyph row. Tiles keep the RAM cost at ~19KB rather than a 115KB frame.
+# A screen can start below the top row to redraw just the lower panel.
+_TILE_ROWS = const(40)
+_screen_ops = None    # pending (font, text, x, y, fg, bg) while a screen is open
+_screen_bg = BLACK
+_screen_top = 0
+
+def begin_screen(bg=BLACK, top=0):
+    global _screen_ops, _screen_bg, _screen_top
+    _screen_ops = []
+    _screen_bg = bg
+    _screen_top = top
+
+def draw_text(font, text, x, y, fg, bg):
+    if _screen_ops is not None:
+        _screen_ops.append((font, text, x, y, fg, bg))
+    else:
+        display.text(font, text, x, y, fg, bg)
+
+def _fb_color(c):
+    # framebuf stores RGB565 little-endian, the display wants big-endian
+    return ((c & 0xFF) << 8) | (c >> 8)
+
+# Glyphs rendered to MONO_HLSB framebuffers, keyed by (font, char code).
+# Splash and mode screens reuse the same few dozen characters, so each is
+# copied out of the font table only once per boot
+_glyph_cache = {}
+
+def _glyph(font, c):
+    key = (font, c)
+    g = _glyph_cache.get(key)
+    if g is None:
+        w = font.WIDTH
+        h = font.HEIGHT
+        size = w * h // 8
+        idx = (c - font.FIRST) * size
+        g = framebuf.FrameBuffer(bytearray(font.FONT[idx:idx + size]), w, h, framebuf.MONO_HLSB)
+        _glyph_cache[key] = g
+    return g
+
+def end_screen():
+    global _screen_ops
+    ops = _screen_ops
+    _screen_ops = None
+    if ops is None:
+        return
+
+    tile_buf = bytearray(_WIDTH * _TILE_ROWS * 2)
+    tile = framebuf.FrameBuffer(tile_buf, _WIDTH, _TILE_ROWS, framebuf.RGB565)
+    palette = framebuf.FrameBuffer(bytearray(4), 2, 1, framebuf.RGB565)
+
+    tile_mv = memoryview(tile_buf)
+
+    for top in range(_screen_top, _HEIGHT, _TILE_ROWS):
+        rows = min(_TILE_ROWS, _HEIGHT - top)
+        tile.fill(_fb_color(_screen_bg))
+        for font, text, x, y, fg, bg in ops:
+            w = font.WIDTH
+            if y + font.HEIGHT <= top or y >= top + _TILE_ROWS:
+                continue  # not in this tile
+            palette.pixel(0, 0, _fb_color(bg))
+            palette.pixel(1, 0, _fb_color(fg))
+            for ch in text:
+                c = ord(ch)
+                if font.FIRST <= c < font.LAST and x + w <= _WIDTH:
+                    tile.blit(_glyph(font, c), x, y - top, -1, palette)
+                x += w
+        display.blit_buffer(tile_mv[:_WIDTH * rows * 2], 0, top, _WIDTH, rows)
 
 # === Determine latitude and longitude from zip code ===
 def get_lat_lon(zip_code, country_code="us"):
@@ -1289,23 +1449,6 @@ def get_lat_lon(zip_code, country_code="us"):
     return None, None, "WiFi or Site Error"
 
 
-# === Get Sunrise and sunset times if needed ====
-def update_sun_times_if_needed(lat, lon, gmt_offset, dst):
-    global sunrise, sunset, last_sun_fetch_day
-    now = time.localtime()
-    today = (now[0], now[1], now[2])  # year, month, day
-
-    if last_sun_fetch_day != today:
-        print("Fetching new sunrise/sunset times...")
-        sr, ss = fetch_sunrise_sunset(lat, lon, gmt_offset, dst)
-        if sr and ss:
-            sunrise = sr
-            sunset = ss
-            last_sun_fetch_day = today
-            print(f"Sunrise: {format_sun_time(sr)}, Sunset: {format_sun_time(ss)}")
-        else:
-            print("Failed to fetch sunrise/sunset times")
-            
 # === Helpers for extracting strings and data from json and streams ====
 
 def extract_first_json_string_value(raw_json, key):
@@ -1335,36 +1478,17 @@ def extract_first_json_string_value(raw_json, key):
 
     return raw_json[start_quote + 1:end_quote]
 
-def extract_first_json_string_value_stream(response_stream, key):
-    """
-    Stream‐parse response_stream for the first JSON string field "key":"value"
-    without loading the full response into RAM.
-    """
-    buf = b""
-    max_buf = 4096
-    # Compile regex pattern like: b'"shortForecast"\s*:\s*"([^"]+)"'
-    pattern = b'"' + key.encode("utf-8") + b'"\\s*:\\s*"([^"]+)"'
-    regex = ure.compile(pattern)
-
-    while True:
-        chunk = response_stream.read(256)
-        if not chunk:
-            break
-        buf += chunk
-        if len(buf) > max_buf:
-            buf = buf[-max_buf:]
-        match = regex.search(buf)
-        if match:
-            return match.group(1).decode("utf-8")
-    return None
-
-def fetch_first_station_id(obs_station_url, headers):
+def fetch_first_station_id(obs_station_url, headers, session=None):
     """
     Stream‐parse the /stations FeatureCollection for the first feature.id
     that contains '/stations/', extracting the station code at the end.
+    Uses `session` (an open NWSSession) when given.
     """
     print("Fetching observation stations list…")
-    r = urequests.get(obs_station_url, headers=headers)
+    if session:
+        r = session.get(obs_station_url, headers=headers)
+    else:
+        r = urequests.get(obs_station_url, headers=headers)
     stream = r.raw
 
     buf = b""
@@ -1403,52 +1527,243 @@ def fetch_first_station_id(obs_station_url, headers):
     print("Failed to extract stationIdentifier from stream.")
     return None
 
-def extract_first_number_stream_generic(stream, pattern):
+def extract_json_fields_stream(stream, keys):
     """
-    Stream-parse `stream` to find the first numeric value matching `pattern`.
-    - stream: a file-like object supporting .read()
-    - pattern: a bytes regex with one capture group for the number, e.g.
-        rb'"temperature"\s*:\s*([0-9]+(?:\.[0-9]+)?)'
-        rb'"relativeHumidity"\s*:\s*\{[^}]*"value"\s*:\s*([0-9]+(?:\.[0-9]+)?)'
-    Returns:
-      float(parsed_number) on success,
-      None if no match or parse error.
+    Single pass over `stream` collecting the first value of each key in
+    `keys`. String values are returned as str, integers as int. Stops
+    reading as soon as every key has been seen. Returns a dict of the keys found.
     """
-    buf = b""                         # rolling buffer of recent bytes
-    max_buf = 4096                    # cap buffer at 4 KB to limit RAM use
-    prog = ure.compile(pattern)       # compile the regex once
+    found = {}
+    needles = [(k, b'"' + k.encode("utf-8") + b'"') for k in keys]
+    buf = b""
 
-    while True:
-        chunk = stream.read(256)      # read small 256-byte chunks
+    while len(found) < len(needles):
+        chunk = stream.read(256)
         if not chunk:
-            break                     # end of stream
-
+            break
         buf += chunk
-        if len(buf) > max_buf:
-            buf = buf[-max_buf:]      # drop oldest data beyond 4 KB
+        n = len(buf)
+        keep = n - 256    # tail kept so a key split across reads is still found
+
+        for key, needle in needles:
+            if key in found:
+                continue
+            i = buf.find(needle)
+            if i == -1:
+                continue
+            j = i + len(needle)
+            while j < n and buf[j] in (32, 9, 10, 13, 58):   # whitespace and ':'
+                j += 1
+            end = -1
+            if j < n and buf[j] == 34:   # '"' - string value
+                end = buf.find(b'"', j + 1)
+                if end != -1:
+                    found[key] = buf[j + 1:end].decode("utf-8")
+            elif j < n:
+                end = j
+                while end < n and (48 <= buf[end] <= 57 or buf[end] == 45):
+                    end += 1
+                if end == n:
+                    end = -1    # number may continue in the next read
+                elif end == j:
+                    found[key] = None    # null or other non-number
+                else:
+                    found[key] = int(buf[j:end].decode())
+            if end == -1 and i < keep:
+                keep = i      # value incomplete, hold on to it
+
+        if keep > 0:
+            buf = buf[keep:]
 
-        m = prog.search(buf)          # search buffer for the pattern
-        if m:
-            # m.group(1) is the first capture—our numeric string
+    return found
+
+# === Keep-alive HTTPS session for api.weather.gov ===
+NWS_HOST = "api.weather.gov"
+
+class NWSResponse:
+    """
+    Body of one response on an NWSSession. Has the parts of the urequests
+    Response the weather code uses: status_code, raw, read(), json(),
+    close(). Handles Content-Length, chunked and read-until-close bodies.
+    """
+    DRAIN_LIMIT = 8192   # drain at most this much on close() to keep the connection
+
+    def __init__(self, session, status_code, length, chunked, keep_alive):
+        self.session = session
+        self.status_code = status_code
+        self.raw = self
+        self._left = None if chunked else length   # bytes left in body / current chunk
+        self._chunked = chunked
+        self._keep = keep_alive and (chunked or length is not None)
+        self._done = False
+        if self._left == 0:
+            self._finish()
+
+    def _finish(self):
+        self._done = True
+        if not self._keep:
+            self.session.close()
+
+    def readinto(self, buf):
+        if self._done:
+            return 0
+        sock = self.session.sock
+        if self._chunked and not self._left:
+            size = int(sock.readline().split(b";")[0].strip(), 16)
+            if size == 0:
+                while sock.readline() not in (b"\r\n", b""):
+                    pass    # trailers
+                self._finish()
+                return 0
+            self._left = size
+        mv = memoryview(buf)
+        if self._left is not None and self._left < len(mv):
+            mv = mv[:self._left]
+        n = sock.readinto(mv)
+        if not n:
+            # Server closed the connection (end of a read-until-close body)
+            self._keep = False
+            self._finish()
+            return 0
+        if self._left is not None:
+            self._left -= n
+            if not self._left:
+                if self._chunked:
+                    sock.readline()    # CRLF after chunk data
+                else:
+                    self._finish()
+        return n
+
+    def read(self, size=-1):
+        if size < 0:
+            out = b""
+            while True:
+                chunk = self.read(1024)
+                if not chunk:
+                    return out
+                out += chunk
+        buf = bytearray(size)
+        n = self.readinto(buf)
+        return bytes(memoryview(buf)[:n])
+
+    def json(self):
+        return json.loads(self.read())
+
+    def close(self, drain=True):
+        # A short unread tail is cheaper to drain than a new TLS handshake;
+        # drain=False drops the connection instead (last request of a batch)
+        if self._done:
+            return
+        if self._keep and drain:
+            buf = bytearray(256)
+            drained = 0
             try:
-                return float(m.group(1))
+                while not self._done and drained < self.DRAIN_LIMIT:
+                    drained += self.readinto(buf)
             except Exception:
-                return None
+                pass
+        if not self._done:
+            self._done = True
+            self.session.close()
 
-    return None                       # no match found
+class NWSSession:
+    """
+    One TLS connection to api.weather.gov kept open (HTTP/1.1 keep-alive)
+    across back-to-back requests, e.g. points -> stations -> forecast, so
+    only the first request pays for the TLS handshake. Close it when the
+    batch is done - an idle TLS socket holds a lot of RAM.
+    """
+    def __init__(self, host=NWS_HOST):
+        self.host = host
+        self.sock = None
+        self._req_tail = ("\r\nHost: " + host + "\r\nUser-Agent: " + USER_AGENT +
+                          "\r\nConnection: keep-alive\r\n\r\n").encode()
+
+    def _connect(self):
+        import socket
+        import ssl
+        ai = socket.getaddrinfo(self.host, 443, 0, socket.SOCK_STREAM)[0]
+        s = socket.socket(ai[0], socket.SOCK_STREAM, ai[2])
+        try:
+            s.connect(ai[-1])
+            self.sock = ssl.wrap_socket(s, server_hostname=self.host)
+        except:
+            s.close()
+            raise
 
-def titlecase(s):
-    return ' '.join(word.capitalize() for word in s.split())
+    def close(self):
+        if self.sock:
+            try:
+                self.sock.close()
+            except Exception:
+                pass
+            self.sock = None
+
+    def get(self, url, headers=None, redirects=1):
+        # headers is accepted for urequests compatibility; User-Agent is built in.
+        # Redirects are followed like urequests does - /points answers 301
+        # to the canonical URL when lat/lon have more than 4 decimals
+        if url.startswith("https://"):
+            host, _, path = url[8:].partition("/")
+            if host != self.host:
+                raise ValueError("NWSSession is for " + self.host + " only")
+            url = "/" + path
+        request = b"GET " + url.encode() + b" HTTP/1.1" + self._req_tail
+
+        for attempt in range(2):
+            reused = self.sock is not None
+            if not reused:
+                self._connect()
+            try:
+                self.sock.write(request)
+                status_line = self.sock.readline()
+                if status_line:
+                    break
+                raise OSError("connection closed")
+            except OSError:
+                # Server may have dropped an idle kept-alive connection
+                self.close()
+                if not reused:
+                    raise
+
+        status_code = int(status_line.split(None, 2)[1])
+        length = None
+        chunked = False
+        keep = True
+        location = None
+        while True:
+            line = self.sock.readline()
+            if not line or line == b"\r\n":
+                break
+            name, _, value = line.partition(b":")
+            name = name.strip().lower()
+            if name == b"content-length":
+                length = int(value)
+            elif name == b"transfer-encoding":
+                chunked = b"chunked" in value.lower()
+            elif name == b"connection":
+                keep = b"close" not in value.lower()
+            elif name == b"location":
+                location = value.strip().decode()
+
+        r = NWSResponse(self, status_code, length, chunked, keep)
+        if location and redirects and status_code in (301, 302, 307, 308):
+            r.close()   # drains the short redirect body, keeping the socket
+            return self.get(location, headers, redirects - 1)
+        return r
 
 # === Weather related functions ===
 
-def get_nws_metadata(lat, lon):
+def get_nws_metadata(lat, lon, session=None):
+    own_session = session is None
+    if own_session:
+        session = NWSSession()
     try:
         headers = {"User-Agent": USER_AGENT}
 
         # Step 1: Get point data for the lat/lon
         print("Fetching point data:", f"https://api.weather.gov/points/{lat},{lon}")
-        r = urequests.get(f"https://api.weather.gov/points/{lat},{lon}", headers=headers)
+        r = session.get(f"https://api.weather.gov/points/{lat},{lon}", headers=headers)
         
         if r.status_code == 404:
             try:
@@ -1468,16 +1783,20 @@ def get_nws_metadata(lat, lon):
                     return f"NWS error: {detail}"
             except Exception:
                 return "NWS 404 error"
+            finally:
+                r.close()   # a shared session must not be left mid-body
 
         if r.status_code != 200:
+            r.close()
             return f"NWS status {r.status_code}"
         
-        raw = r.text
-        print("Downloaded length (point data):", len(raw))
+        # Pull just the fields we need out of the response stream - the
+        # point document is large and never needs to be held in full
+        properties = extract_json_fields_stream(
+            r.raw,
+            ("forecast", "forecastHourly", "observationStations", "gridId", "gridX", "gridY"))
         r.close()
-
-        point_data = json.loads(raw)
-        properties = point_data.get("properties", {})
+        print("Point data fields found:", list(properties.keys()))
 
         forecast_url = properties.get("forecast")
         obs_station_url = properties.get("observationStations")
@@ -1498,10 +1817,10 @@ def get_nws_metadata(lat, lon):
 
         # Fetch the first observation station ID
         print("Fetching observation stations list:", obs_station_url)
-        station_id = fetch_first_station_id(obs_station_url, headers)
+        station_id = fetch_first_station_id(obs_station_url, headers, session)
 
         # Clean up to free memory
-        del raw, point_data, properties
+        del properties
         gc.collect()
 
         if not station_id:
@@ -1517,7 +1836,11 @@ def get_nws_metadata(lat, lon):
     except Exception as e:
         print("Error fetching NWS metadata:", e)
         sys.print_exception(e)
+        session.close()   # unread data may be left on the socket
         return None
+    finally:
+        if own_session:
+            session.close()
 
 import time
 
@@ -1527,11 +1850,11 @@ def parse_iso8601(s):
     Returns (year, month, day, hour, minute, second)
     """
     try:
-        date_str, time_str = s.split('T')
-        year, month, day = map(int, date_str.split('-'))
-        time_part = time_str.split('+')[0].split('-')[0]  # Remove timezone offset
-        hour, minute, second = map(int, time_part.split(':'))
-        return (year, month, day, hour, minute, second)
+        # YYYY-MM-DDTHH:MM:SS at fixed offsets, timezone suffix ignored
+        if s[10] != 'T':
+            raise ValueError("not YYYY-MM-DDTHH:MM:SS")
+        return (int(s[0:4]), int(s[5:7]), int(s[8:10]),
+                int(s[11:13]), int(s[14:16]), int(s[17:19]))
     except Exception as e:
         print("Error parsing ISO8601:", e)
         return None
@@ -1569,92 +1892,157 @@ def find_period_bounds(raw, pos):
     # fallback if no match found
     return start, len(raw) - 1
 
-def extract_forecast_periods_stream(response_stream, max_night_periods=3, max_day_periods=7, max_buf=4096):
+# Key scanners for a single period object. Each returns (value, cursor)
+# and raises ValueError when the key or its value isn't where expected.
+def _value_start(buf, key, start):
+    i = buf.find(key, start)
+    if i == -1:
+        raise ValueError(key)
+    i = buf.find(b':', i + len(key))
+    if i == -1:
+        raise ValueError(key)
+    i += 1
+    n = len(buf)
+    while i < n and (buf[i] == 0x20 or 0x09 <= buf[i] <= 0x0D):
+        i += 1
+    return i
+
+def _read_str(buf, key, start):
+    q1 = _value_start(buf, key, start)
+    if buf[q1:q1 + 1] != b'"':
+        raise ValueError(key)
+    q2 = buf.find(b'"', q1 + 1)
+    if q2 == -1:
+        raise ValueError(key)
+    return buf[q1 + 1:q2].decode("utf-8"), q2 + 1
+
+def _read_int(buf, key, start):
+    a = _value_start(buf, key, start)
+    b = a
+    n = len(buf)
+    while b < n and 0x30 <= buf[b] <= 0x39:
+        b += 1
+    if b == a:
+        raise ValueError(key)
+    return int(buf[a:b]), b
+
+def _read_bool(buf, key, start):
+    i = _value_start(buf, key, start)
+    if buf[i:i + 4] == b'true':
+        return True, i + 4
+    if buf[i:i + 5] == b'false':
+        return False, i + 5
+    raise ValueError(key)
+
+@micropython.viper
+def _find_balanced_braces(buf, start: int, end: int) -> int:
+    # Index of the '}' closing the '{' at start, or -1 if not in buf yet
+    p = ptr8(buf)
+    depth = 0
+    i = start
+    while i < end:
+        c = p[i]
+        if c == 123:        # '{'
+            depth += 1
+        elif c == 125:      # '}'
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return -1
+
+# Regex fallback for period objects the key scan can't read; compiled on
+# first use only
+_period_res = None
+
+def _regex_period_fields(text):
+    global _period_res
+    if _period_res is None:
+        _period_res = (
+            ure.compile(rb'"name"\s*:\s*"([^"]*)"'),
+            ure.compile(rb'"isDaytime"\s*:\s*(true|false)'),
+            ure.compile(rb'"temperature"\s*:\s*(\d+)'),
+            ure.compile(rb'"shortForecast"\s*:\s*"([^"]*)"'),
+        )
+    re_name, re_day, re_temp, re_short = _period_res
+
+    m = re_name.search(text)
+    name = m.group(1).decode("utf-8") if m else ""
+    m = re_day.search(text)
+    is_daytime = m.group(1) == b"true" if m else False
+    m = re_temp.search(text)
+    try:
+        temperature = int(m.group(1)) if m else None
+    except:
+        temperature = None
+    m = re_short.search(text)
+    short_forecast = m.group(1).decode("utf-8") if m else ""
+    return name, is_daytime, temperature, short_forecast
+
+def extract_forecast_periods_stream(response_stream, max_night_periods=3, max_day_periods=7, max_buf=8192):
+    # Fields are collected column-wise, one list per field, rather than
+    # as a dict per period
+    names = []
+    shorts = []
+    temps = []
+    days = []
+    periods = (names, shorts, temps, days)
     buf = b""
-    periods = []
     idx = 0
     day_count = 0
     night_count = 0
     in_periods = False # only start extracting after "periods"
-
-    def find_balanced_braces_stream(text, start_idx):
-        brace_count = 0
-        started = False
-        for i in range(start_idx, len(text)):
-            c = text[i]
-            if c == ord('{'):
-                brace_count += 1
-                started = True
-            elif c == ord('}'):
-                brace_count -= 1
-                if brace_count == 0 and started:
-                    return i
-        return -1
-
-    # Precompile regexes for fields
-    pattern_name = ure.compile(rb'"name"\s*:\s*"([^"]*)"')
-    pattern_shortForecast = ure.compile(rb'"shortForecast"\s*:\s*"([^"]*)"')
-    pattern_temperature = ure.compile(rb'"temperature"\s*:\s*(\d+)')
-    pattern_isDaytime = ure.compile(rb'"isDaytime"\s*:\s*(true|false)')
-
-    def extract_str(pattern, text):
-        m = pattern.search(text)
-        return m.group(1).decode("utf-8") if m else ""
-
-    def extract_int(pattern, text):
-        m = pattern.search(text)
-        try:
-            return int(m.group(1)) if m else None
-        except:
-            return None
-
-    def extract_bool(pattern, text):
-        m = pattern.search(text)
-        return m.group(1) == b"true" if m else False
+    marker = b'"periods": ['
 
     while True:
-        chunk = response_stream.read(256)
+        chunk = response_stream.read(1024)
         if not chunk:
             break
-        buf += chunk
+        # Drop what has already been parsed so only the unparsed tail is
+        # copied when the new chunk is appended
+        if idx:
+            buf = buf[idx:] + chunk
+            idx = 0
+        else:
+            buf += chunk
         if len(buf) > max_buf:
-            # Keep only the most recent data, but preserve unprocessed tail
-            unprocessed = buf[idx:]
-            buf = unprocessed[-max_buf:]
-            idx = 0  # reset index because buffer changed
+            buf = buf[-max_buf:]
 
         while True:
             if not in_periods:
-                periods_start = buf.find(b'"periods": [',idx)
+                periods_start = buf.find(marker)
                 if periods_start == -1:
+                    # Discard the preamble, keeping just enough to catch a
+                    # marker split across reads
+                    buf = buf[-(len(marker) - 1):]
                     break # wait for more data
-                idx = periods_start + len(b'"periods": [')
+                idx = periods_start + len(marker)
                 in_periods = True
                 
-            num_idx = buf.find(b'"number":', idx)
-            if num_idx == -1:
-                break  # No more periods found in buffer yet
-
-            # Find the '{' before num_idx
-            start_obj = buf.rfind(b'{', 0, num_idx)
-            if start_obj == -1 or start_obj < idx:
-                # fallback: find next '{' after num_idx
-                start_obj = buf.find(b'{', num_idx)
-                if start_obj == -1:
-                    break  # can't find object start, wait for more data
-
-            end_obj = find_balanced_braces_stream(buf, start_obj)
+            # Only commas and whitespace sit between period objects, so the
+            # next '{' opens the next period and a ']' ends the array
+            start_obj = buf.find(b'{', idx)
+            if buf.find(b']', idx, len(buf) if start_obj == -1 else start_obj) != -1:
+                return periods
+            if start_obj == -1:
+                break  # can't find object start, wait for more data
+
+            end_obj = _find_balanced_braces(buf, start_obj, len(buf))
             if end_obj == -1:
                 # incomplete JSON object; wait for more data
                 break
 
             period_text = buf[start_obj:end_obj+1]
 
-            # Extract fields
-            name = extract_str(pattern_name, period_text)
-            shortForecast = extract_str(pattern_shortForecast, period_text)
-            temperature = extract_int(pattern_temperature, period_text)
-            isDaytime = extract_bool(pattern_isDaytime, period_text)
+            # Extract fields in the order NWS emits them, each search
+            # starting where the previous value ended
+            try:
+                name, pos = _read_str(period_text, b'"name"', 0)
+                isDaytime, pos = _read_bool(period_text, b'"isDaytime"', pos)
+                temperature, pos = _read_int(period_text, b'"temperature"', pos)
+                shortForecast, pos = _read_str(period_text, b'"shortForecast"', pos)
+            except ValueError:
+                name, isDaytime, temperature, shortForecast = _regex_period_fields(period_text)
 
             should_append = False
             if isDaytime and day_count < max_day_periods:
@@ -1665,34 +2053,44 @@ def extract_forecast_periods_stream(response_stream, max_night_periods=3, max_da
                 should_append = True
 
             if should_append:
-                periods.append({
-                    "name": name,
-                    "shortForecast": shortForecast,
-                    "temperature": temperature,
-                    "isDaytime": isDaytime,
-                })
+                names.append(name)
+                shorts.append(shortForecast)
+                temps.append(temperature)
+                days.append(isDaytime)
                 
             if day_count >= max_day_periods and night_count >= max_night_periods:
                 return periods
 
             idx = end_obj + 1
 
-        # Reset index if we have parsed beyond buffer end
-        if idx >= len(buf):
-            idx = 0
-
     return periods
 
 def split_forecast_text(text):
     """Split a forecast string into two parts if it contains ' then '."""
     if not text:
         return "", None
-    parts = text.split(" then ", 1)
-    if len(parts) == 2:
-        return parts[0].strip(), parts[1].strip()
+    head, sep, tail = text.partition(" then ")
+    if sep:
+        return head.strip(), tail.strip()
     return text.strip(), None
 
+# Shared placeholder returned when no forecast could be fetched; callers
+# only read it
+_NA_PERIOD = {
+    "name": "N/A",
+    "shortForecast": "N/A",
+    "forecast1": "N/A",
+    "forecast2": None,
+    "simpleForecast": "N/A",
+    "forecast1_short": "N/A",
+    "forecast2_short": None,
+    "temperature": None,
+    "isDaytime": None,
+}
+
 def get_weather_data(lat, lon, metadata, headers):
+    # Metadata refresh and forecast share one TLS connection
+    session = NWSSession()
     try:
 
         periods = []
@@ -1703,103 +2101,93 @@ def get_weather_data(lat, lon, metadata, headers):
         # Retry fetching metadata if missing
         if not station_id or not forecast_url or not hourly_url:
             print("Metadata incomplete, refreshing metadata...")
-            metadata = get_nws_metadata(lat, lon)
+            metadata = get_nws_metadata(lat, lon, session)
             
             if isinstance(metadata, str):
                 print("Metadata fetch error (non-fatal):", metadata)
-                return [{
-                    "name": "N/A",
-                    "shortForecast": "N/A",
-                    "simpleForecast": "N/A",
-                    "temperature": None,
-                    "isDaytime": None,
-                }]
+                return [_NA_PERIOD]
             
             if not metadata:
                 print("Failed to refresh metadata, returning None")
-                return [{
-                    "name": "N/A",
-                    "shortForecast": "N/A",
-                    "simpleForecast": "N/A",
-                    "temperature": None,
-                    "isDaytime": None,
-                }]
+                return [_NA_PERIOD]
             
             station_id = metadata.get("station_id")
             forecast_url = metadata.get("forecast_url")
             hourly_url = metadata.get("hourly_url")
 
         # Do forecast fetch for multi=day forecast
-        print("Fetching URL:", forecast_url)
-        print("Before fetching forecast JSON:")
-        print_memory_usage()
-        test_free_memory()
+        if _DEBUG:
+            print("Fetching URL:", forecast_url)
+            print("Before fetching forecast JSON:")
+            print_memory_usage()
+        if gc.mem_free() < _GC_FLOOR:
+            gc.collect()
         
         period = []
         try:
-            r = urequests.get(forecast_url, headers=headers)
-            gc.collect()
-            
-            periods = extract_forecast_periods_stream(r.raw)
-            gc.collect()
-            r.close()
+            # r.raw reads straight off the TLS socket; the body is never
+            # buffered whole, only max_buf of it at a time in the parser
+            r = session.get(forecast_url, headers=headers)
+            try:
+                names, shorts, temps, days = extract_forecast_periods_stream(r.raw)
+            finally:
+                # Parsing stops once enough periods are read; the forecast is
+                # the last request on this session, so drop the rest unread
+                r.close(drain=False)
             del r
-            gc.collect()
+            if gc.mem_free() < _GC_FLOOR:
+                gc.collect()
             
-            # DEBUG: print what was parsed
-            print("Parsed forecast periods:")
-            for i, f in enumerate(periods):
-                print(f"Period {i}: name={f['name']!r}, shortForecast={f['shortForecast']!r}")
-
-            print("After fetching forecast JSON (raw text in memory):")
-            print_memory_usage()
-            test_free_memory()
-
-            # Extract multiple forecast periods
-            # Post-process each period to simplify forecast and trim name
-            for period in periods:
-                short_forecast = period.get("shortForecast", "")
+            if _DEBUG:
+                print("Parsed forecast periods:")
+                for i in range(len(names)):
+                    print(f"Period {i}: name={names[i]!r}, shortForecast={shorts[i]!r}")
+
+                print("After fetching forecast JSON (raw text in memory):")
+                print_memory_usage()
+                test_free_memory()
+
+            # Build each period's record in one go from the parsed columns,
+            # adding the split and simplified forecasts
+            periods = []
+            for i in range(len(names)):
+                short_forecast = shorts[i]
                 forecast1, forecast2 = split_forecast_text(short_forecast)
-
-                period["forecast1"] = forecast1
-                period["forecast2"] = forecast2 
-                period["simpleForecast"] = simplify_forecast(short_forecast)
-                period["forecast1_short"] = simplify_forecast(forecast1)
-                period["forecast2_short"] = simplify_forecast(forecast2) if forecast2 else None
+                simple = simplify_forecast(short_forecast)
+                periods.append({
+                    "name": names[i],
+                    "shortForecast": short_forecast,
+                    "temperature": temps[i],
+                    "isDaytime": days[i],
+                    "forecast1": forecast1,
+                    "forecast2": forecast2,
+                    "simpleForecast": simple,
+                    # Without a "then" part forecast1 is the whole forecast
+                    "forecast1_short": simplify_forecast(forecast1) if forecast2 is not None else simple,
+                    "forecast2_short": simplify_forecast(forecast2) if forecast2 else None,
+                })
+            del names, shorts, temps, days
                 
             if not periods:
-                periods = [{
-                    "name": "N/A",
-                    "shortForecast": "N/A",
-                    "simpleForecast": "N/A",
-                    "temperature": None,
-                    "isDaytime": None,
-                }]
+                periods = [_NA_PERIOD]
             
             print(f"Extracted {len(periods)} forecast periods")
-            for i, period in enumerate(periods):
-                print(f"Period {i}: name='{period.get('name', '')}'")
-                print(f"Period {i}: shortForecast='{period.get('shortForecast', '')}'")
-                print(f"Period {i}: simpleForecast='{period.get('simpleForecast', '')}'")
-                print(f"Period {i}: forecast1='{period['forecast1']}'")
-                print(f"Period {i}: forecast1_short='{period['forecast1_short']}'")
-                if period['forecast2']:
-                    print(f"          forecast2='{period['forecast2']}'")
-                    print(f"          forecast2_short='{period['forecast2_short']}'")
-            print("After extracting forecast periods")
-            print_memory_usage()
+            if _DEBUG:
+                for i, period in enumerate(periods):
+                    print(f"Period {i}: name='{period.get('name', '')}'")
+                    print(f"Period {i}: shortForecast='{period.get('shortForecast', '')}'")
+                    print(f"Period {i}: simpleForecast='{period.get('simpleForecast', '')}'")
+                    print(f"Period {i}: forecast1='{period['forecast1']}'")
+                    print(f"Period {i}: forecast1_short='{period['forecast1_short']}'")
+                    if period['forecast2']:
+                        print(f"          forecast2='{period['forecast2']}'")
+                        print(f"          forecast2_short='{period['forecast2_short']}'")
+                print("After extracting forecast periods")
+                print_memory_usage()
             
         except Exception as e:
             print("Error fetching or parsing forecast data:", e)
-            periods = [{
-                "name": "N/A",
-                "shortForecast": "N/A",
-                "forecast1": "N/A",
-                "forecast2": None,
-                "simpleForecast": "N/A",
-                "temperature": None,
-                "isDaytime": None,
-            }]
+            periods = [_NA_PERIOD]
                   
         # Return the final values
         return periods
@@ -1808,15 +2196,21 @@ def get_weather_data(lat, lon, metadata, headers):
         print("Error in get_weather_data:", e)
         sys.print_exception(e)
         
-        return [{
-            "name": "N/A",
-            "shortForecast": "N/A",
-            "forecast1": "N/A",
-            "forecast2": None,
-            "simpleForecast": "N/A",
-            "temperature": None,
-            "isDaytime": None,
-        }]
+        return [_NA_PERIOD]
+    finally:
+        session.close()
+
+# Mapping for known long holidays
+_HOLIDAY_MAP = {
+    "Thanksgiving Day": "Thanksgiving",
+    "Christmas Day": "Christmas",
+    "Christmas Night": "Xmas Night",
+    "New Year's Day": "New Year",
+    "New Year's Night": "New Year Night",
+    "Independence Day": "July 4",
+    "Washington's Birthday": "Presidents",
+    "Martin Luther King Jr. Day": "MLK Day",
+}
 
 def shorten_period_name(name):
     """Shorten forecast period names to fit within 14 characters."""
@@ -1825,20 +2219,8 @@ def shorten_period_name(name):
 
     name = name.strip()
 
-    # Mapping for known long holidays
-    holiday_map = {
-        "Thanksgiving Day": "Thanksgiving",
-        "Christmas Day": "Christmas",
-        "Christmas Night": "Xmas Night",
-        "New Year's Day": "New Year",
-        "New Year's Night": "New Year Night",
-        "Independence Day": "July 4",
-        "Washington's Birthday": "Presidents",
-        "Martin Luther King Jr. Day": "MLK Day",
-    }
-
-    if name in holiday_map:
-        return holiday_map[name]
+    if name in _HOLIDAY_MAP:
+        return _HOLIDAY_MAP[name]
 
     # Handle "<Day of Week> Night" → "Mon Night"
     if name.endswith("Night"):
@@ -1853,185 +2235,236 @@ def shorten_period_name(name):
 
     return name
 
-def simplify_forecast(forecast):
-    MODIFIERS = ["Slight Chance", "Light", "Chance", "Mostly", "Partly", "Partial",
-                 "Shallow", "Patches", "Patchy", "Likely", "Heavy", "Scattered",
-                 "Isolated", "Drifting", "Blowing", "Few", "Broken", "Widespread",
-                 "Frequent", "Gust", "Gusty", "Intermittent", "Increasing", "Occasional",
-                 "Variable"
-    ]
-    CONDITIONS = [
-        "Tornado", "Funnel Cloud", "Hailstorm", "Hailstorms", "Blizzard", "Winter Storm", "Winter Weather",
-        "Freezing Rain", "Freezing Drizzle", "Hail", "Sleet", "Ice", "Frost",
-        "Flash Flood", "Flood", "Dust Storm", "Smoke", "Volcanic Ash", "Dust", "Spray", "Sand",
-        "Hurricane", "Tropical storm", "Thunderstorms", "Sandstorm",
-        "Thunderstorm", "T-storms", "Tstorms", "Lightning",
-        "Storm", "Squall", "Showers", "Rain", "Precipitation",
-        "Fog", "Snow", "Clear", "Sunny",
-        "Cloudy", "Overcast", "Windy", "Gusty", "Wind", "Drizzle",
-        "Haze", "Mist", "Snow Grains", "Ice Crystals", "Ice Pellets", "Snow Pellets"
-    ]
-    # First, make sure there is a valid forecast
-    if not forecast or not isinstance(forecast, str):
-        return "No Forecast"
-    
-    # Define priority by order in CONDITIONS list (lower index = higher priority)
-    # Find highest priority condition (lowest index in CONDITIONS)
+# Forecast vocabulary for simplify_forecast. CONDITIONS order is priority
+# (lower index = higher priority).
+MODIFIERS = ("Slight Chance", "Light", "Chance", "Mostly", "Partly", "Partial",
+             "Shallow", "Patches", "Patchy", "Likely", "Heavy", "Scattered",
+             "Isolated", "Drifting", "Blowing", "Few", "Broken", "Widespread",
+             "Frequent", "Gust", "Gusty", "Intermittent", "Increasing", "Occasional",
+             "Variable"
+)
+CONDITIONS = (
+    "Tornado", "Funnel Cloud", "Hailstorm", "Hailstorms", "Blizzard", "Winter Storm", "Winter Weather",
+    "Freezing Rain", "Freezing Drizzle", "Hail", "Sleet", "Ice", "Frost",
+    "Flash Flood", "Flood", "Dust Storm", "Smoke", "Volcanic Ash", "Dust", "Spray", "Sand",
+    "Hurricane", "Tropical storm", "Thunderstorms", "Sandstorm",
+    "Thunderstorm", "T-storms", "Tstorms", "Lightning",
+    "Storm", "Squall", "Showers", "Rain", "Precipitation",
+    "Fog", "Snow", "Clear", "Sunny",
+    "Cloudy", "Overcast", "Windy", "Gusty", "Wind", "Drizzle",
+    "Haze", "Mist", "Snow Grains", "Ice Crystals", "Ice Pellets", "Snow Pellets"
+)
+_MODIFIERS_LC = tuple(m.lower() for m in MODIFIERS)
+_CONDITIONS_LC = tuple(c.lower() for c in CONDITIONS)
+
+def _plural(word):
+    if word[-1] == "s":
+        return word
+    return word + ("es" if word[-1] == "o" else "s")
+
+def _word_index(phrases):
+    # Single words map straight to their list index; two-word phrases are
+    # keyed by their first word as (second word, index) pairs. Plurals
+    # ("squalls") match too, at the lower of the two indexes; a second word
+    # matches as a prefix ("flash flooding"), see _simplify_forecast
+    single = {}
+    first = {}
+    for i, p in enumerate(phrases):
+        words = p.split()
+        if len(words) == 1:
+            single.setdefault(p, i)
+            pl = _plural(p)
+            single[pl] = min(single.get(pl, i), i)
+        else:
+            first.setdefault(words[0], []).append((words[1], i))
+    return single, first
+
+_MOD_SINGLE, _MOD_FIRST_WORDS = _word_index(_MODIFIERS_LC)
+_COND_SINGLE, _COND_FIRST_WORDS = _word_index(_CONDITIONS_LC)
+_MOD_SINGLE["gusty"] = _MOD_SINGLE["gust"]   # "Gusty Winds" -> "Gust Gusty", as before
+_PUNCT = "/.()!?:\""   # split words on these as well as whitespace
+
+def _substring_match(tok, phrases, earliest):
+    # Old-style lookup for words not in the tables ("foggy", "rainfall",
+    # "thundershowers"): index of a phrase found inside tok, or -1.
+    # earliest picks the one starting first (modifiers), else lowest index
+    best = -1
+    best_pos = len(tok)
+    for i, p in enumerate(phrases):
+        pos = tok.find(p)
+        if pos == -1:
+            continue
+        if not earliest:
+            return i
+        if pos < best_pos:
+            best, best_pos = i, pos
+    return best
+
+# Shortened forms used when a modifier and condition share the line, to
+# keep the phrase under 14 characters (modifiers 6 chars, conditions 7-8)
+_MOD_ABBREV = {
+    "isolated": "Isol",
+    "slight chance": "Chance",
+    "scattered": "Scattr",
+    "partial": "Prtial",
+    "shallow": "Shllow",
+    "patches": "Patchy",
+    "drifting": "Drftng",
+    "blowing": "Blowng",
+    "widespread": "Wdsprd",
+    "frequent": "Frqunt",
+    "intermittent": "Intmit",
+    "increasing": "Increa",
+    "occasional": "Occasl",
+    "variable": "Variab",
+}
+_COND_ABBREV = {
+    "hailstorm": "Hailstrm",
+    "hailstorms": "Hailstrm",
+    "blizzard": "Blizzrd",
+    "winter storm": "Win Stm",
+    "winter weather": "Win Weth",
+    "freezing rain": "Fr Rain",
+    "freezing drizzle": "Fr Drzl",
+    "flash flood": "Fl Flood",
+    "dust storm": "Dust St",
+    "volcanic ash": "Volc Ash",
+    "hurricane": "Hurrcan",
+    "tropical storm": "Trop St",
+    "thunderstorm": "Tstorms",
+    "thunderstorms": "Tstorms",
+    "t-storms": "Tstorms",
+    "precipitation": "Precip",
+    "funnel cloud": "FunlCld",
+    "sandstorm": "SndStrm",
+    "snow grains": "Snw Grs",
+    "ice crystals": "Ice Xtl",
+    "ice pellets": "Ice Plt",
+    "snow pellets": "Snw Plt",
+    "overcast": "Ovrcast",
+    "lightning": "Lightng",
+}
 
-    # Cut off forecast at any strong separator (only use "current" condition)
-    for sep in [" then ", ";", ","]:
-        if sep in forecast.lower():
-            forecast = forecast.lower().split(sep, 1)[0]
-            break
+_SIMPLIFY_CACHE = {}   # raw forecast string -> simplified phrase
+_PAIR_TO_PHRASE = {}   # (modifier, condition) index key -> display phrase
 
-    forecast = forecast.strip().lower()
+def _pair_phrase(mod_i, cond_i):
+    # <modifier> <condition>, abbreviated to keep the total under 14 characters
+    if mod_i != -1:
+        mod_lc = _MODIFIERS_LC[mod_i]
+        found_modifier = MODIFIERS[mod_i]
+    else:
+        mod_lc = found_modifier = ""
+    if cond_i < len(CONDITIONS):
+        cond_lc = _CONDITIONS_LC[cond_i]
+        found_condition = CONDITIONS[cond_i]
+    else:
+        cond_lc = found_condition = ""
 
-    found_modifiers = []
-    found_conditions = []
+    if not found_modifier:
+        if cond_lc == "freezing drizzle":
+            found_condition = "Frzing Drizzle"
+    else:
+        found_modifier = _MOD_ABBREV.get(mod_lc, found_modifier)
+        found_condition = _COND_ABBREV.get(cond_lc, found_condition)
 
-    # Find all modifiers present with positions
-    for mod in MODIFIERS:
-        pos = forecast.find(mod.lower())
-        if pos != -1:
-            found_modifiers.append((pos, mod))
+    return f"{found_modifier} {found_condition}".strip()[:14]
 
-    # Find all conditions present with positions
-    for cond in CONDITIONS:
-        pos = forecast.find(cond.lower())
-        if pos != -1:
-            found_conditions.append((pos, cond))
+def simplify_forecast(forecast):
+    # First, make sure there is a valid forecast
+    if not forecast or not isinstance(forecast, str):
+        return "No Forecast"
 
-    # Pick earliest modifier if any
-    found_modifiers.sort(key=lambda x: x[0])
-    found_modifier = found_modifiers[0][1] if found_modifiers else ""
+    # The same few phrases recur across periods and refreshes
+    hit = _SIMPLIFY_CACHE.get(forecast)
+    if hit is not None:
+        return hit
+    phrase = _simplify_forecast(forecast)
+    if len(_SIMPLIFY_CACHE) >= 32:
+        _SIMPLIFY_CACHE.clear()
+    _SIMPLIFY_CACHE[forecast] = phrase
+    return phrase
 
-    # Pick highest priority condition present:
-    # conditions with lowest index in CONDITIONS list are highest priority
-    priority_found_conditions = [(CONDITIONS.index(cond), pos, cond)
-                                 for pos, cond in found_conditions if cond in CONDITIONS]
-    priority_found_conditions.sort()  # sorts by priority index, then position, then cond
-    found_condition = priority_found_conditions[0][2] if priority_found_conditions else ""
+def _simplify_forecast(forecast):
+    forecast = forecast.lower()
 
-    # Special rules for modifiers + conditions to keep total under 14 characters
-    # First, if no modifier, just check for the over 14 character conditions and shorten
-    if not found_modifier:
-        if found_condition.lower() =="freezing drizzle":
-            found_condition = "Frzing Drizzle"
- 
-    # If get here, there is modifier, to check modifiers and conditions
-    else:    
-        #First check modifiers and make 6 chars or less
-        if found_modifier.lower() == "isolated":
-            found_modifier = "Isol"
-        if found_modifier.lower() == "slight chance":
-            found_modifier = "Chance"
-        if found_modifier.lower() == "scattered":
-            found_modifier = "Scattr"
-        if found_modifier.lower() == "partial":
-            found_modifier = "Prtial"
-        if found_modifier.lower() == "shallow":
-            found_modifier = "Shllow"
-        if found_modifier.lower() == "patches":
-            found_modifier = "Patchy"
-        if found_modifier.lower() == "drifting":
-            found_modifier = "Drftng"
-        if found_modifier.lower() == "blowing":
-            found_modifier = "Blowng"
-        if found_modifier.lower() == "widespread":
-            found_modifier = "Wdsprd"
-        if found_modifier.lower() == "frequent":
-            found_modifier = "Frqunt"
-        if found_modifier.lower() == "intermittent":
-            found_modifier = "Intmit"
-        if found_modifier.lower() == "increasing":
-            found_modifier = "Increa"
-        if found_modifier.lower() == "occasional":
-            found_modifier = "Occasl"
-        if found_modifier.lower() == "variable":
-            found_modifier = "Variab"
-        # Next check conditions and make 7 chars or less
-        if found_condition.lower() =="hailstorm":
-            found_condition = "Hailstrm"
-        if found_condition.lower() =="hailstorms":
-            found_condition = "Hailstrm"
-        if found_condition.lower() =="blizzard":
-            found_condition = "Blizzrd"
-        if found_condition.lower() =="winter storm":
-            found_condition = "Win Stm"
-        if found_condition.lower() =="winter weather":
-            found_condition = "Win Weth"
-        if found_condition.lower() =="freezing rain":
-            found_condition = "Fr Rain"
-        if found_condition.lower() =="freezing drizzle":
-            found_condition = "Fr Drzl"
-        if found_condition.lower() =="flash flood":
-            found_condition = "Fl Flood"
-        if found_condition.lower() =="dust storm":
-            found_condition = "Dust St"
-        if found_condition.lower() =="volcanic ash":
-            found_condition = "Volc Ash"
-        if found_condition.lower() =="hurricane":
-            found_condition = "Hurrcan"
-        if found_condition.lower() =="tropical storm":
-            found_condition = "Trop St"
-        if found_condition.lower() =="thunderstorm":
-            found_condition = "Tstorms"
-        if found_condition.lower() =="thunderstorms":
-            found_condition = "Tstorms"
-        if found_condition.lower() =="thunderstorms":
-            found_condition = "Tstorms"
-        if found_condition.lower() =="t-storms":
-            found_condition = "Tstorms"
-        if found_condition.lower() =="precipitation":
-            found_condition = "Precip"
-        if found_condition.lower() =="funnel cloud":
-            found_condition = "FunlCld"
-        if found_condition.lower() =="sandstorm":
-            found_condition = "SndStrm"
-        if found_condition.lower() =="snow grains":
-            found_condition = "Snw Grs"
-        if found_condition.lower() =="ice crystals":
-            found_condition = "Ice Xtl"
-        if found_condition.lower() =="ice pellets":
-            found_condition = "Ice Plt"
-        if found_condition.lower() =="snow pellets":
-            found_condition = "Snw Plt"
-        if found_condition.lower() =="overcast":
-            found_condition = "Ovrcast"
-        if found_condition.lower() =="lightning":
-            found_condition = "Lightng"
-            
-    phrase = f"{found_modifier} {found_condition}".strip()
+    # Cut off forecast at any strong separator (only use "current" condition)
+    for sep in (" then ", ";", ","):
+        if sep in forecast:
+            forecast = forecast.split(sep, 1)[0]
+            break
 
-    if not found_condition and not found_modifier:
+    forecast = forecast.strip()
+
+    # One pass over the words: the modifier is the earliest one found, the
+    # condition the highest priority one (lowest index in CONDITIONS)
+    words = forecast
+    for ch in _PUNCT:
+        if ch in words:
+            words = words.replace(ch, " ")
+    tokens = words.split()
+    n = len(tokens)
+    mod_i = -1
+    cond_i = len(CONDITIONS)
+    for t in range(n):
+        tok = tokens[t]
+        nxt = tokens[t + 1] if t + 1 < n else None
+        if (tok not in _COND_SINGLE and tok not in _COND_FIRST_WORDS and
+                tok not in _MOD_SINGLE and tok not in _MOD_FIRST_WORDS):
+            if mod_i == -1:
+                mod_i = _substring_match(tok, _MODIFIERS_LC, True)
+            i = _substring_match(tok, _CONDITIONS_LC, False)
+            if i != -1 and i < cond_i:
+                cond_i = i
+            continue
+        if mod_i == -1:
+            i = _MOD_SINGLE.get(tok, -1)
+            for second, j in _MOD_FIRST_WORDS.get(tok, ()):
+                if nxt and nxt.startswith(second) and (i == -1 or j < i):
+                    i = j
+            mod_i = i
+        i = _COND_SINGLE.get(tok, cond_i)
+        if i < cond_i:
+            cond_i = i
+        for second, j in _COND_FIRST_WORDS.get(tok, ()):
+            if nxt and nxt.startswith(second) and j < cond_i:
+                cond_i = j
+
+    if mod_i == -1 and cond_i == len(CONDITIONS):
         # Fallback: just use first 14 chars of forecast, capitalized
-        print("No Condition or Modifier found - Phrase:", phrase, "| type:", type(phrase))
-        print("Using truncated Forecast - Forecast:", forecast, "| type:", type(forecast))
+        if _DEBUG:
+            print("No Condition or Modifier found - Using truncated Forecast:", forecast)
         s = forecast[:14]
-        return s[0].upper() + s[1:] if s else s
-    
-    # Return capitalized short forecast, <modifier> <condition>, truncated to 14 chars
-    print("phrase:", phrase, "| type:", type(phrase))
-    return phrase[:14]
+        return s[:1].upper() + s[1:]
+
+    # One int key per (modifier, condition) pair; "none" is -1 / len(CONDITIONS)
+    key = (mod_i + 1) * 64 + cond_i
+    phrase = _PAIR_TO_PHRASE.get(key)
+    if phrase is None:
+        phrase = _pair_phrase(mod_i, cond_i)
+        _PAIR_TO_PHRASE[key] = phrase
+    if _DEBUG:
+        print("phrase:", phrase, "| type:", type(phrase))
+    return phrase
 
     
 def display_weather(interval, temp, humidity, description, is_daytime=None):
     # Clear only the areas we'll update (not the whole screen)
-#     display.fill_rect(0, 0, 240, 60, color565(0, 0, 0))     # header
-    display.fill_rect(0, 60, 240, 180, color565(0, 0, 0))   # lower part
+#     display.fill_rect(0, 0, 240, 60, BLACK)     # header
+    display.fill_rect(0, 60, 240, 180, BLACK)   # lower part
     
 
-    center_lgtext(f"{interval}", 125, color565(220, 170, 240))
+    center_lgtext(f"{interval}", 125, LAVENDER565)
     line = description
     icon_x = (240 - 63) // 2  # Centered icon
     draw_weather_icon(display, line, icon_x, 60, is_daytime)
     
     # Display 14 character weather conditions
-    center_hugetext(line, 140, color565(255, 255, 0))
+    center_hugetext(line, 140, YELLOW565)
 
     if humidity is not None:
-        display.text(font_huge, f"{temp}F", 50, 175, color565(255, 100, 100))
-        display.text(font_huge, f"{int(humidity)}%", 130, 175, color565(100, 255, 100))
+        display.text(font_huge, f"{temp}F", 50, 175, PINK565)
+        display.text(font_huge, f"{int(humidity)}%", 130, 175, MINT565)
     else:
         try:
             prefix = "High: " if is_daytime else "Low: "
@@ -2040,29 +2473,29 @@ def display_weather(interval, temp, humidity, description, is_daytime=None):
         except:
             temp_str = f"{temp}F" # fallback
         if is_daytime:
-            center_hugetext(temp_str, 175, color565(255, 100, 100))
+            center_hugetext(temp_str, 175, PINK565)
         else:
-            center_hugetext(temp_str, 175, color565(144, 213, 255))
+            center_hugetext(temp_str, 175, ICEBLUE565)
         
 def display_then():
     # Blank just the icon area and condition text
-#    display.fill_rect(0, 60, 240, 64, color565(0, 0, 0))    # icon area
-    display.fill_rect(0, 140, 240, 32, color565(0, 0, 0))   # forecast text area
+#    display.fill_rect(0, 60, 240, 64, BLACK)    # icon area
+    display.fill_rect(0, 140, 240, 32, BLACK)   # forecast text area
 
 #    center_hugetext("Then", 140, color565(150, 200, 255))   # soft blue/cyan
-    center_lgtext("Then", 148, color565(150, 200, 255))   # soft blue/cyan
+    center_lgtext("Then", 148, SKYBLUE565)   # soft blue/cyan
     
 def display_forecast2(interval, temp, humidity, description, is_daytime=None):
     # Same layout as display_weather, but no need to clear entire lower section
     # Only clear icon and description area
-    display.fill_rect(0, 60, 240, 64, color565(0, 0, 0))    # icon area
-    display.fill_rect(0, 140, 240, 32, color565(0, 0, 0))   # forecast text area
+    display.fill_rect(0, 60, 240, 64, BLACK)    # icon area
+    display.fill_rect(0, 140, 240, 32, BLACK)   # forecast text area
 
     icon_x = (240 - 63) // 2  # Centered icon
     draw_weather_icon(display, description, icon_x, 60, is_daytime)
 
     # Forecast 2 text
-    center_hugetext(description, 140, color565(255, 255, 0))  # same as forecast1
+    center_hugetext(description, 140, YELLOW565)  # same as forecast1
         
 def format_sun_time(t):
     # t is a time.struct_time or tuple like (year, month, day, hour, minute, second, ...)
@@ -2083,36 +2516,176 @@ def format_sun_time(t):
         hour_12 = 12
     return f"{hour_12}:{minute:02d} {am_pm}"
 
+_sun_icons = None   # (sunrise, sunset) RGB565 buffers, read from flash once
+
 def display_sun_times(sunrise, sunset):
-    display.fill_rect(0, 60, 240, 180, color565(0, 0, 0))  # Clear lower part
+    global _sun_icons
+    display.fill_rect(0, 60, 240, 180, BLACK)  # Clear lower part
     
     if sunrise and sunset:
         sunrise_str = format_sun_time(sunrise)
         sunset_str = format_sun_time(sunset)
     
-        # Load 64x64 icons
-        with open("/icons/sunrise_rgb565.raw", "rb") as f:
-            sunrise_icon = f.read()
-        with open("/icons/sunset_rgb565.raw", "rb") as f:
-            sunset_icon = f.read()
+        # Load 48x48 icons on first use
+        if _sun_icons is None:
+            with open("/icons/sunrise_rgb565.raw", "rb") as f:
+                sunrise_icon = f.read()
+            with open("/icons/sunset_rgb565.raw", "rb") as f:
+                sunset_icon = f.read()
+            _sun_icons = (sunrise_icon, sunset_icon)
+        sunrise_icon, sunset_icon = _sun_icons
       # Sunrise icon
         display.blit_buffer(sunrise_icon, 20, 70, 48, 48)
 
         # Sunrise text
-        display.text(font_lg,"Sunrise:", 80, 70, color565(255, 255, 0))
-        display.text(font_huge, sunrise_str, 80, 90, color565(255, 255, 0))
+        display.text(font_lg,"Sunrise:", 80, 70, YELLOW565)
+        display.text(font_huge, sunrise_str, 80, 90, YELLOW565)
 
         # Sunset icon
         display.blit_buffer(sunset_icon, 20, 140, 48, 48)
 
         # Sunset text
-        display.text(font_lg, "Sunset:", 80, 140, color565(255, 160, 0))
-        display.text(font_huge, sunset_str, 80, 160, color565(255, 160, 0))   
-#        center_lgtext("Sunrise:", 80, color565(255, 255, 0))
-#        center_hugetext(sunrise_str, 100, color565(255, 255, 0))
+        display.text(font_lg, "Sunset:", 80, 140, ORANGE565)
+        display.text(font_huge, sunset_str, 80, 160, ORANGE565)   
+#        center_lgtext("Sunrise:", 80, YELLOW565)
+#        center_hugetext(sunrise_str, 100, YELLOW565)
 #        center_lgtext("Sunset:", 140, color565(255, 160, 0))
 #        center_hugetext(sunset_str, 160, color565(255, 160, 0))
         
+# === Forecast display cycle ===
+# Cycle slot 0 is the sunrise/sunset screen, slots 1.. are the forecast
+# periods. Each slot runs through phases:
+#   0  show the slot (every 10 s)
+#   1  after 4 s, show "Then"          (only when there is a forecast2)
+#   2  after 2 s, show forecast2
+#   3  after 4 s, advance to the next slot
+#  -1  sun times / N/A screen: wait out the 10 s, then advance
+# Each handler takes (cycle, now) with now from time.ticks_ms() and
+# returns how many ms until it is next due.
+class ForecastSlot:
+    # Display fields of one forecast period, resolved once per fetch
+    __slots__ = ("interval", "temp", "f1", "f2", "day")
+
+    def __init__(self, f):
+        self.interval = shorten_period_name(f.get("name", "Forecast"))
+        self.temp = f.get("temperature") or 0
+        self.f1 = f.get("forecast1_short") or "N/A"
+        self.f2 = f.get("forecast2_short")
+        self.day = f.get("isDaytime", None)
+
+class ForecastCycle:
+    __slots__ = ("forecasts", "cycle_index", "cycle_length",
+                 "forecast_phase", "phase_start_time", "last_forecast_switch",
+                 "current", "wifi_status")
+
+    def __init__(self):
+        self.forecasts = []
+        self.cycle_index = 0
+        self.cycle_length = 0
+        self.forecast_phase = 0
+        self.phase_start_time = 0
+        self.last_forecast_switch = 0
+        self.current = None  # ForecastSlot being shown
+        self.wifi_status = None  # (text, color) shown under the sun times
+
+    def show_wifi_status(self):
+        # The status line lives in the sun-times screen's free band at y=210;
+        # the forecast screens use that area, so it is only drawn there.
+        # "WiFi OK" is shown once, Retry/Fail stay until the link is back
+        status = self.wifi_status
+        if status and self.cycle_index == 0 and self.forecast_phase == -1:
+            display.fill_rect(0, 210, 240, 30, BLACK)
+            center_smtext(status[0], 210, status[1])
+            if status[1] == LIMEGREEN565:
+                self.wifi_status = None
+
+    def set_forecasts(self, forecasts):
+        self.forecasts = [ForecastSlot(f) for f in forecasts]
+        self.cycle_length = len(forecasts) + 1
+
+    def advance(self):
+        self.forecast_phase = 0
+        self.cycle_index += 1
+        if self.cycle_index >= self.cycle_length:
+            self.cycle_index = 0
+
+def _phase_show(cycle, now):
+    wait = 10000 - time.ticks_diff(now, cycle.last_forecast_switch)
+    if wait > 0:
+        return wait
+    if _DEBUG:
+        print("Cycle index:", cycle.cycle_index, "Cycle length:", cycle.cycle_length)
+    cycle.last_forecast_switch = now  # Mark 10 sec forecast cycle start
+    cycle.phase_start_time = now  # Mark start of inter-forecast interval phase
+    forecasts = cycle.forecasts
+
+    if cycle.cycle_index == 0:
+        display_sun_times(sunrise, sunset)
+        cycle.forecast_phase = -1  # no follow-up phases
+        cycle.show_wifi_status()
+                
+    elif forecasts and (cycle.cycle_index - 1) < len(forecasts):
+        forecast = forecasts[cycle.cycle_index - 1]
+        cycle.current = forecast
+
+        if _DEBUG:
+            print("Interval:", forecast.interval)
+            print("Forecast1:", forecast.f1)
+            if forecast.f2:
+                print("Forecast2:", forecast.f2)
+
+        display_weather(forecast.interval, forecast.temp, None, forecast.f1, is_daytime=forecast.day)
+        cycle.forecast_phase = 1 if forecast.f2 else 3  # skip intermediate phases if no forecast2
+    else:
+        display_weather("N/A", None, None, "N/A")
+        cycle.forecast_phase = -1
+    return 10000 if cycle.forecast_phase == -1 else 4000
+
+def _phase_then(cycle, now):
+    # Phase 1: After 4s, show "Then"
+    wait = 4000 - time.ticks_diff(now, cycle.phase_start_time)
+    if wait > 0:
+        return wait
+    display_then()
+    cycle.phase_start_time = now
+    cycle.forecast_phase = 2
+    return 2000
+
+def _phase_forecast2(cycle, now):
+    # Phase 2: After 2s, show forecast2
+    wait = 2000 - time.ticks_diff(now, cycle.phase_start_time)
+    if wait > 0:
+        return wait
+    forecast = cycle.current
+    display_forecast2(forecast.interval, forecast.temp, None, forecast.f2, is_daytime=forecast.day)
+    cycle.phase_start_time = now
+    cycle.forecast_phase = 3
+    return 4000
+
+def _phase_advance(cycle, now):
+    # Phase 3: Wait for remainder of 10s, then advance cycle
+    wait = 4000 - time.ticks_diff(now, cycle.phase_start_time)
+    if wait > 0:
+        return wait
+    cycle.advance()
+    return max(0, 10000 - time.ticks_diff(now, cycle.last_forecast_switch))
+
+def _phase_hold(cycle, now):
+    # Phase -1: used for sunrise/sunset or N/A display, just wait 10s then reset
+    wait = 10000 - time.ticks_diff(now, cycle.last_forecast_switch)
+    if wait > 0:
+        return wait
+    cycle.advance()
+    return 0
+
+_PHASE_HANDLERS = {
+    0: _phase_show,
+    1: _phase_then,
+    2: _phase_forecast2,
+    3: _phase_advance,
+    -1: _phase_hold,
+}
+
 # === Weather Program ===
 def application_mode(settings):
     
@@ -2121,7 +2694,7 @@ def application_mode(settings):
     
     global start_update_requested
     global gmt_offset
-    global sunrise, sunset, last_sun_fetch_day, last_displayed_time, last_displayed_date, last_sun_update_date
+    global sunrise, sunset, last_displayed_time, last_displayed_date, last_sun_update_date
     global retry_allowed
 
     lat = settings["lat"]
@@ -2134,21 +2707,20 @@ def application_mode(settings):
     last_sync = time.time()
     last_weather_update = time.time()
     temp = humidity = None
-    forecasts = []
     last_displayed_time = ""
     last_displayed_date = ""
+    next_minute = 0     # epoch second the local minute next rolls over
+    last_minute = -1
+    last_day = -1
+    sun_fetch_attempts = 0
     
     # Forecast update parameters
-    forecast_phase = 0
-    phase_start_time = 0
-    forecast_interval = ""
-    forecast_temp = 0
-    forecast1 = None
-    forecast2 = None
-    forecast_day = None
-    last_forecast_switch = 0
-    cycle_index = 0
-    cycle_length = 0
+    cycle = ForecastCycle()
+
+    # Wi-Fi liveness check, backing off 60 -> 600 s while the link stays down
+    wifi_check_due = time.time() + _WIFI_CHECK_MIN
+    wifi_backoff = _WIFI_CHECK_MIN
+    wifi_retrying = False
     
     # Determine Latitude and Longitude
 #    lat, lon = get_lat_lon(zip_code)
@@ -2175,10 +2747,7 @@ def application_mode(settings):
                 center_lgtext("Location Error", 80)
                 center_smtext(reason, 100)
                 center_smtext("Going to Setup Mode", 120)
-                for count in range(5,0, -1):
-                    display.fill_rect(0, 140, 240, 16, color565(0, 0, 0))
-                    center_smtext(f"in {count} seconds", 160)
-                    time.sleep(1)
+                countdown(160)
                             
                 setup_mode()
                 server.run()
@@ -2200,10 +2769,7 @@ def application_mode(settings):
                 center_lgtext("Location Error", 80)
                 center_smtext(metadata, 100)
                 center_smtext("Going to Setup Mode", 140)
-                for count in range(5, 0, -1):
-                    display.fill_rect(0, 160, 240, 16, color565(0, 0, 0))
-                    center_smtext(f"in {count} seconds", 160)
-                    time.sleep(1)
+                countdown(160)
 
                 setup_mode()
                 server.run()
@@ -2225,32 +2791,31 @@ def application_mode(settings):
         headers = {"User-Agent": USER_AGENT}
         new_forecasts = get_weather_data(lat, lon, metadata, headers)
         if new_forecasts:
-            forecasts = new_forecasts
+            cycle.set_forecasts(new_forecasts)
             
             # Fetch initial sunrise/sunset (we already have gmt_offset and dst from settings)
-            sunrise, sunset = fetch_sunrise_sunset(lat, lon, gmt_offset)
+            sunrise, sunset = get_sun_times(lat, lon, gmt_offset)
 
-            cycle_length = len(forecasts) + 1
             
             print("Sunrise: ", format_sun_time(sunrise))
             print("Sunset: ", format_sun_time(sunset))
             display_sun_times(sunrise, sunset)
 
         else:
-            forecasts = []
-            cycle_length = 1
-            display.fill(color565(0, 0, 0))
+            cycle.set_forecasts(())
+            begin_screen()
             center_lgtext("Weather data", 80)
             center_lgtext("unavailable", 100)
+            end_screen()
     else:
-        forecasts = []
-        cycle_length = 1
-        display.fill(color565(0, 0, 0))
+        cycle.set_forecasts(())
+        begin_screen()
         center_lgtext("Location data", 80)
         center_lgtext("unavailable", 100)
+        end_screen()
         
-    cycle_index = 1  # Start  with forecast, sunrise/sunset already displayed
-    last_forecast_switch = time.time()  # ensures your display cycle works on the correct timing
+    cycle.cycle_index = 1  # Start  with forecast, sunrise/sunset already displayed
+    cycle.last_forecast_switch = time.ticks_ms()  # ensures your display cycle works on the correct timing
 
     while True:
         if start_update_requested:
@@ -2261,15 +2826,16 @@ def application_mode(settings):
 
         # Time and weather loop - update weather every 5 mins, time every sec
 
-        current_time = time.time()
+        current_time = time.time()   # read once; every check below uses it
     
-        # Sync time every SYNC_INTERVAL (1 hour/3600 sec)
-        if current_time - last_sync >= SYNC_INTERVAL:
+        # Sync time every _SYNC_INTERVAL (1 hour/3600 sec)
+        if current_time - last_sync >= _SYNC_INTERVAL:
             sync_time()
             last_sync = current_time
+            next_minute = 0     # clock may have stepped; re-read local time
     
-        # Refresh forecasts WEATH_INTERVAL (30 min/1800 sec) 
-        if current_time - last_weather_update >= WEATH_INTERVAL:
+        # Refresh forecasts _WEATH_INTERVAL (30 min/1800 sec) 
+        if current_time - last_weather_update >= _WEATH_INTERVAL:
             if not lat_lon_complete and retry_allowed:
                 print("Lat/lon not available, attempting Zip lookup...")
                 lat, lon, reason = get_lat_lon(settings.get("zip", "").strip())
@@ -2291,10 +2857,7 @@ def application_mode(settings):
                         center_lgtext("Location Error", 80)
                         center_smtext(reason, 100)
                         center_smtext("Going to Setup Mode", 120)
-                        for count in range(5,0, -1):
-                            display.fill_rect(0, 140, 240, 16, color565(0, 0, 0))
-                            center_smtext(f"in {count} seconds", 160)
-                            time.sleep(1)
+                        countdown(160)
                             
                         setup_mode()
                         server.run()
@@ -2305,116 +2868,90 @@ def application_mode(settings):
             if lat_lon_complete:     
                 new_forecasts = get_weather_data(lat, lon, metadata, headers)
                 if new_forecasts:
-                    forecasts = new_forecasts
-                    cycle_length = len(forecasts) + 1
+                    cycle.set_forecasts(new_forecasts)
                 else:
-                    forecasts = []
-                    cycle_length = 1
-                    display.fill_rect(0, 60, 240, 180, color565(0, 0, 0)) # x, y, w, h
+                    cycle.set_forecasts(())
+                    begin_screen(top=60)  # lower panel only, clock stays
                     center_lgtext("Weather Data", 80)
                     center_lgtext("Unavailable", 100)
+                    end_screen()
             
             last_weather_update = current_time
+            current_time = time.time()   # the fetch can take several seconds
         
-        # Start new forecast display cycle every 10s
-        if forecast_phase == 0 and time.time() - last_forecast_switch >= 10:
-            print(f"Cycle index: {cycle_index}, Cycle length: {cycle_length}")
-            last_forecast_switch = time.time()  # Mark 10 sec forecast cycle start
-            phase_start_time = last_forecast_switch  # Mark start of inter-forecast interval phase
-            
-            if cycle_index == 0:
-                display_sun_times(sunrise, sunset)
-                forecast_phase = -1  # no follow-up phases
-                
-                # Wi-Fi reconnection check
-                if not is_connected_to_wifi():
-                    print("[WiFi] Disconnected. Attempting to reconnect...")
-                    center_smtext("WiFi Retry", 210, color565(64, 64, 255))
-                    connect_to_wifi(settings["ssid"], settings["password"])
-                    if is_connected_to_wifi():
-                        print("[WiFi] Reconnected successfully.")
-                        display.fill_rect(0, 210, 240, 30, color565(0, 0, 0))
-                        center_smtext("WiFi OK", 210, color565(64, 255, 64))
-                        time.sleep(2)
-                    else:
-                        print("[WiFi] Reconnection failed.")
-                        display.fill_rect(0, 210, 240, 30, color565(0, 0, 0))
-                        center_smtext("WiFi Fail", 210, color565(255, 64, 64))
-                        time.sleep(2)
-                        
-            elif forecasts and (cycle_index - 1) < len(forecasts):
-                forecast = forecasts[cycle_index - 1]
-                forecast_interval = shorten_period_name(forecast.get("name", "Forecast"))
-                forecast_temp = forecast.get("temperature") or 0
-                forecast1 = forecast.get("forecast1_short") or "N/A"
-                forecast2 = forecast.get("forecast2_short")
-                forecast_day = forecast.get("isDaytime", None)
-
-                print(f"Interval: {forecast_interval}")
-                print(f"Forecast1: {forecast1}")
-                if forecast2:
-                    print(f"Forecast2: {forecast2}")
-
-                display_weather(forecast_interval, forecast_temp, None, forecast1, is_daytime=forecast_day)
-                forecast_phase = 1 if forecast2 else 3  # skip intermediate phases if no forecast2
+        # Wi-Fi check on its own schedule; connect() returns at once and the
+        # result is picked up on the next check, so the clock keeps running
+        if current_time >= wifi_check_due:
+            wlan = network.WLAN(network.STA_IF)
+            if wlan.isconnected():
+                if wifi_retrying:
+                    print("[WiFi] Reconnected successfully.")
+                    cycle.wifi_status = ("WiFi OK", LIMEGREEN565)
+                    wifi_retrying = False
+                wifi_backoff = _WIFI_CHECK_MIN
             else:
-                display_weather("N/A", None, None, "N/A")
-                forecast_phase = -1
-
-        # Phase 1: After 4s, show "Then"
-        elif forecast_phase == 1 and time.time() - phase_start_time >= 4:
-            display_then()
-            phase_start_time = time.time()
-            forecast_phase = 2
-
-        # Phase 2: After 2s, show forecast2
-        elif forecast_phase == 2 and time.time() - phase_start_time >= 2:
-            display_forecast2(forecast_interval, forecast_temp, None, forecast2, is_daytime=forecast_day)
-            phase_start_time = time.time()
-            forecast_phase = 3
-
-        # Phase 3: Wait for remainder of 10s, then advance cycle
-        elif forecast_phase == 3 and time.time() - phase_start_time >= 4:
-            forecast_phase = 0
-            cycle_index += 1
-            if cycle_index >= cycle_length:
-                cycle_index = 0
-
-        # Phase -1: used for sunrise/sunset or N/A display, just wait 10s then reset
-        elif forecast_phase == -1 and time.time() - last_forecast_switch >= 10:
-            forecast_phase = 0
-            cycle_index += 1
-            if cycle_index >= cycle_length:
-                cycle_index = 0
+                if wifi_retrying:
+                    print("[WiFi] Reconnection failed.")
+                    cycle.wifi_status = ("WiFi Fail", SOFTRED565)
+                    wifi_backoff = min(wifi_backoff * 2, _WIFI_CHECK_MAX)
+                else:
+                    cycle.wifi_status = ("WiFi Retry", ROYALBLUE565)
+                if wlan.status() != network.STAT_CONNECTING:
+                    print("[WiFi] Disconnected. Attempting to reconnect...")
+                    wlan.active(True)
+                    wlan.connect(settings["ssid"], settings["password"])
+                wifi_retrying = True
+            wifi_check_due = current_time + wifi_backoff
+            cycle.show_wifi_status()   # at once if the sun times are up
+
+        # Run the current forecast display phase; it returns ms until it is next due
+        wait_ms = _PHASE_HANDLERS[cycle.forecast_phase](cycle, time.ticks_ms())
                 
-        # Get localtime *once* per loop
-        now = localtime_with_offset()
-        current_time_str = format_12h_time(now)
-        current_date_str = "{} {}".format(MONTHS[now[1]-1], now[2])
-        
-        # Update time display every second
-        if current_time_str != last_displayed_time:
-            update_time_only(current_time_str)
-            last_displayed_time = current_time_str
-            
-        # Update date only when it changes
-        if current_date_str != last_displayed_date:
-            update_date_only(current_date_str)
-            last_displayed_date = current_date_str
-
-        # Inline sunrise/sunset update logic: fetch once per local day, shortly after midnight (e.g. between 00:01 and 00:10)
-        if last_sun_update_date != current_date_str:
-        # Extract hour and minute from now (assuming now = (year, month, day, hour, minute, sec, wday, yday))
-            hour = now[3]
-            minute = now[4]
-
-            if hour == 0 and 1 <= minute <= 10:
-                # Time to fetch sunrise/sunset for the new day
-                print("Fetching new sunrise/sunset data for date:", current_date_str)
-                sunrise, sunset = fetch_sunrise_sunset(lat, lon, gmt_offset)
-                last_sun_update_date = current_date_str
+        # Clock, date and the midnight sun-times check only change on a new
+        # minute; local time is converted once then and reused until it rolls
+        if current_time >= next_minute:
+            now = localtime_with_offset()
+            next_minute = current_time + 60 - now[5]
+
+            # Time and date strings are only rebuilt when their fields change
+            minute_of_day = now[3] * 60 + now[4]
+            if minute_of_day != last_minute:
+                last_minute = minute_of_day
+                current_time_str = format_12h_time(now)
+                if current_time_str != last_displayed_time:
+                    update_time_only(current_time_str)
+                    last_displayed_time = current_time_str
+
+            if now[2] != last_day:
+                last_day = now[2]
+                sun_fetch_attempts = 0
+                current_date_str = "{} {}".format(MONTHS[now[1]-1], now[2])
+                if current_date_str != last_displayed_date:
+                    update_date_only(current_date_str)
+                    last_displayed_date = current_date_str
+
+            # Inline sunrise/sunset update logic: fetch once per local day, shortly after midnight (between 00:01 and 00:10),
+            # with a single retry from 00:30 if that attempt fails
+            if last_sun_update_date != last_displayed_date and now[3] == 0:
+                minute = now[4]
+                if (sun_fetch_attempts == 0 and 1 <= minute <= 10) or (sun_fetch_attempts == 1 and minute >= 30):
+                    sun_fetch_attempts += 1
+                    # Time to fetch sunrise/sunset for the new day
+                    print("Fetching new sunrise/sunset data for date:", last_displayed_date)
+                    sr, ss = get_sun_times(lat, lon, gmt_offset)
+                    if sr and ss:
+                        sunrise, sunset = sr, ss
+                        last_sun_update_date = last_displayed_date
+                    else:
+                        print("Sunrise/sunset fetch failed, keeping previous times")
 
-        time.sleep(0.1)  # Short sleep to maintain responsiveness
+        # Sleep until the next thing is due - a phase step, the clock's next
+        # minute, a weather refresh, time sync or Wi-Fi check - but at most
+        # 1 s so the update switch stays responsive
+        due = min(next_minute, wifi_check_due,
+                  last_weather_update + _WEATH_INTERVAL, last_sync + _SYNC_INTERVAL)
+        wait_ms = min(wait_ms, (due - current_time) * 1000)
+        time.sleep_ms(min(1000, max(10, wait_ms)))
 
 #        time.sleep(1)
     
@@ -2422,16 +2959,19 @@ def application_mode(settings):
 # ===                If Wifi connection OK, go to Weather program ===
 # Figure out which mode to start up in...
 try:
+    tune_gc_threshold()
     print("=== Free memory at start of main code ===")
     test_free_memory()
     
     # See if setup wifi switch is pressed
     if setup_sw.value() == False:
-        t = 20  # Switch must be pressed for >2 secs on power-up
-        while setup_sw.value() == False and t > 0:
-            t -= 1
-            time.sleep(0.1)
-        if setup_sw.value() == False:
+        # Switch must be held for >2 secs on power-up. The press happened
+        # before the IRQ was armed, so start its timer here and let the
+        # release edge clear it while we sleep
+        press_time = time.ticks_ms()
+        time.sleep_ms(2000)
+        if press_time is not None and setup_sw.value() == False:
+            press_time = None   # so the eventual release isn't taken as an update request
             print("Setup switch - entering setup mode")
             setup_mode()
             server.run()
@@ -2440,14 +2980,11 @@ try:
     status, settings, reason = load_settings()
     if status in ("missing", "invalid", "corrupt"):
         # Display reason for error in settings
-        display.fill(color565(0, 0, 0))
-        center_lgtext("Settings Error", 80, color565(255,0,0))
+        display.fill(BLACK)
+        center_lgtext("Settings Error", 80, RED565)
         center_smtext(reason, 120)
         center_smtext("Entering Setup Mode", 140)
-        for count in range(5,0, -1):   # Count down from 5 to 1
-            display.fill_rect(0, 160, 240, 16, color565(0, 0, 0))  # Clears 1 text line
-            center_smtext(f"in {count} seconds", 160)
-            time.sleep(1)
+        countdown(160)
         print(f"Settings status = {status}. Reason: {reason}. Entering setup mode")
         setup_mode()
         server.run()
@@ -2461,9 +2998,6 @@ try:
 #     display.fill(rgb888_to_rgb565(255, 254, 140))
 #    display.fill(rgb888_to_rgb565(255, 255, 255))
 
-#    image_path = "/icons/pl_logo_sparse_gryscl.raw"
-#    draw_sparse_1color_grayscale(display, image_path)
-
     image_path = "/icons/sc_logo_sparse.raw"
     draw_sparse_multicolor_grayscale(display, image_path)
 
@@ -2471,35 +3005,44 @@ try:
     
     # Try to connect to Wifi
     wifi_current_attempt = 1
-    while (wifi_current_attempt < WIFI_MAX_ATTEMPTS):
+    wifi_backoff = 1
+    while (wifi_current_attempt < _WIFI_MAX_ATTEMPTS):
         print(settings['ssid'])
         print(settings['password'])
         print(settings['zip'])
         print(f"Connecting to wifi {settings['ssid']} attempt [{wifi_current_attempt}]")
         
-        display.fill(color565(0, 0, 0))
-        center_smtext("Connecting to", 40, color565(173, 216, 230))
-        center_smtext("WiFi Network SSID:", 60, color565(173, 216, 230))
-        center_lgtext(f"{settings['ssid']}", 100, color565(255, 255, 0))
+        begin_screen()
+        center_smtext("Connecting to", 40, LIGHTBLUE565)
+        center_smtext("WiFi Network SSID:", 60, LIGHTBLUE565)
+        center_lgtext(f"{settings['ssid']}", 100, YELLOW565)
+        end_screen()
         ip_address = connect_to_wifi(settings["ssid"], settings["password"])
         if is_connected_to_wifi():
             print(f"Connected to wifi, IP address {ip_address}")
                 
-            display.fill(color565(0, 0, 0))
-            center_lgtext("Sage &",40, color565(255, 254, 140))
-            center_lgtext("Circuit",60, color565(255, 254, 140))
-            center_lgtext("Forecaster",80, color565(255, 254, 140))
+            begin_screen()
+            center_lgtext("Sage &",40, CREAM565)
+            center_lgtext("Circuit",60, CREAM565)
+            center_lgtext("Forecaster",80, CREAM565)
             center_smtext(f"v{__version__}",100)
-            center_smtext("Connected:", 120, color565(173, 216, 230))
-            center_smtext(f"WiFi SSID: {settings['ssid']}", 140, color565(173, 216, 230))
-            center_smtext(f"This IP: {ip_address}", 160, color565(173, 216, 230))
+            center_smtext("Connected:", 120, LIGHTBLUE565)
+            center_smtext(f"WiFi SSID: {settings['ssid']}", 140, LIGHTBLUE565)
+            center_smtext(f"This IP: {ip_address}", 160, LIGHTBLUE565)
             center_smtext(f"Zip Code: {settings['zip']}", 180)
+            end_screen()
 
             time.sleep(1)
             break
         
         else:
+            if network.WLAN(network.STA_IF).status() == network.STAT_WRONG_PASSWORD:
+                print("[WiFi] Wrong password, not retrying")
+                break
             wifi_current_attempt += 1
+            if wifi_current_attempt < _WIFI_MAX_ATTEMPTS:
+                time.sleep(wifi_backoff)   # let the AP settle before the next attempt
+                wifi_backoff = min(wifi_backoff * 2, _WIFI_BOOT_BACKOFF_MAX)
                 
     if is_connected_to_wifi():
 #        zip_code = settings["zip"]
@@ -2519,10 +3062,7 @@ try:
                 center_lgtext("Location Error", 80)
                 center_smtext(reason, 100)
                 center_smtext("Going to Setup Mode", 120)
-                for count in range(5,0, -1):   # Count down from 5 to 1
-                    display.fill_rect(0, 140, 240, 16, color565(0, 0, 0))  # Clears 1 text line
-                    center_smtext(f"in {count} seconds", 160)
-                    time.sleep(1)
+                countdown(160)
 
                 setup_mode()
                 server.run()
@@ -2538,14 +3078,12 @@ try:
         msg = f"Error (Code: {status})"
             
         # Display Wifi connect failed message and error
-        display.fill(color565(0, 0, 0))
+        begin_screen()
         center_smtext("WiFi Connect Failed:", 80)
         center_smtext(msg,100)
         center_smtext("Going to Setup", 120)
-        for count in range(5,0, -1):   # Count down from 5 to 1
-            display.fill_rect(0, 140, 240, 16, color565(0, 0, 0))  # Clears 1 text line
-            center_smtext(f"in {count} seconds", 140)
-            time.sleep(1)
+        end_screen()
+        countdown(140)
         #Print wifi connect error to console
         print(f"Wifi connect failed {msg}")
         # Log wifi connect error to log file
@@ -2555,10 +3093,9 @@ try:
         server.run()
 
 except Exception as e:
-    # Log the error
-    buf = uio.StringIO()
-    sys.print_exception(e, buf)
-#     logging.exception(buf.getvalue())
+    # Log the error straight to the console; no buffer to allocate when
+    # the heap may already be exhausted
+    sys.print_exception(e)
     
 #     logging.info("Restarting device in 2 seconds...")
     time.sleep(2)
@@ -104,6 +104,45 @@ class Request:
     print("[read_body_chunk] Failed to get chunk after retries, returning empty bytes")
     return b''
 
+  async def readinto_body(self, buf):
+    # Same as read_body_chunk() but fills a caller-owned buffer instead of
+    # allocating a new bytes object per chunk.
+    # Returns number of bytes read, 0 on EOF, -1 if body can't be read yet
+    if not hasattr(self, "_reader") or not self._streaming_body:
+        print("[readinto_body] No reader or streaming disabled")
+        return -1
+
+    if self._content_length is None:
+        print("[readinto_body] No content-length set, cannot read body")
+        return -1
+
+    remaining = self._content_length - self._body_bytes_read
+    if remaining <= 0:
+        return 0  # EOF signal
+
+    mv = memoryview(buf)
+    if remaining < len(buf):
+        mv = mv[:remaining]
+
+    max_attempts = 10
+    attempts = 0
+    while attempts < max_attempts:
+        try:
+            n = await self._reader.readinto(mv)
+            if n is None:
+                attempts += 1
+                await uasyncio.sleep(0.1)
+                continue
+            # n == 0 means connection closed (EOF)
+            self._body_bytes_read += n
+            return n
+        except Exception as e:
+            print(f"[readinto_body] Exception while reading: {e}")
+            return -1
+
+    print("[readinto_body] Failed to read after retries, returning EOF")
+    return 0
+
 
 
   def __str__(self):